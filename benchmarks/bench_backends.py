@@ -0,0 +1,69 @@
+"""
+Parity and speed of the fp32 / int8 / ONNX sentiment backends.
+
+    python -m benchmarks.bench_backends --model /path/to/finbert --n 1000
+
+Exits non-zero when a backend's scores deviate from fp32 by more than its
+TOLERANCE: ONNX must match fp32, int8 may drift by quantization error.
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.bench_batching import synthetic_corpus
+from src.nlp.backends import BACKENDS
+from src.nlp.sentiment import MAX_BATCH_TOKENS, MODEL_PATH, load_model, score_texts
+
+# max |score - fp32 score| allowed per backend
+TOLERANCE = {"torch": 0.0, "int8": 0.25, "onnx": 1e-3}
+
+def latency_ms(texts, tokenizer, model, reps=50):
+    """Median single-headline latency."""
+    times = []
+    for t in texts[:reps]:
+        start = time.perf_counter()
+        score_texts([t], tokenizer, model)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default=MODEL_PATH)
+    ap.add_argument("--n", type=int, default=1000)
+    ap.add_argument("--parity-n", type=int, default=200)
+    args = ap.parse_args()
+
+    texts = synthetic_corpus(args.n)
+    sample = synthetic_corpus(args.parity_n, seed=1)
+
+    baseline = None
+    failed = []
+    print(f"{'backend':<8} {'max |dev|':>10} {'agree':>7} {'p50 ms':>8} {'articles/s':>11}")
+
+    for backend in BACKENDS:
+        tokenizer, model = load_model(backend, args.model)
+
+        ref, _ = score_texts(sample, tokenizer, model, max_tokens=MAX_BATCH_TOKENS)
+        ref = np.asarray(ref)
+        if baseline is None:
+            baseline = ref
+        dev = np.abs(ref - baseline).max()
+        # same sign bucket (neg / ~0 / pos) as fp32
+        agree = (np.sign(np.round(ref, 1)) == np.sign(np.round(baseline, 1))).mean()
+
+        lat = latency_ms(texts, tokenizer, model)
+        start = time.perf_counter()
+        score_texts(texts, tokenizer, model, max_tokens=MAX_BATCH_TOKENS)
+        rate = len(texts) / (time.perf_counter() - start)
+
+        print(f"{backend:<8} {dev:>10.4f} {agree:>7.1%} {lat:>8.2f} {rate:>11.1f}")
+        if dev > TOLERANCE[backend]:
+            failed.append(f"{backend} deviates by {dev:.4f} (tolerance {TOLERANCE[backend]})")
+
+    if failed:
+        raise SystemExit("Parity check failed: " + "; ".join(failed))
+
+if __name__ == "__main__":
+    main()
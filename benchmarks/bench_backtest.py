@@ -0,0 +1,84 @@
+"""
+Threshold sweep on synthetic prices and sentiment: checks the broadcast
+sweep against a per-config loop over classify()'s rule, then times a
+large grid.
+
+    python -m benchmarks.bench_backtest --days 60 --tickers 50
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_signals import synthetic_scored
+from src.signals.backtest import forward_returns, grid_arg, sweep
+from src.signals.make_signals import compute_signals
+
+def synthetic_prices(tickers, hours, start, rng):
+    """Hourly random-walk closes for T0..T{tickers-1}, with a few gaps."""
+    steps = rng.normal(0, 0.01, (tickers, hours + 48))
+    closes = 100 * np.exp(np.cumsum(steps, axis=1))
+    stamps = start + pd.to_timedelta(np.arange(hours + 48), unit="h")
+    prices = pd.DataFrame({
+        "timestamp": np.tile(stamps, tickers),
+        "ticker": np.repeat([f"T{i}" for i in range(tickers)], hours + 48),
+        "close": closes.ravel(),
+    })
+    return prices[rng.random(len(prices)) > 0.02].sort_values("timestamp", kind="stable")
+
+def loop_sweep(signals, returns, configs):
+    """One config at a time, the way hand-tuning would re-run make_signals."""
+    rows = []
+    delta = signals["sentiment_delta"].to_numpy()
+    volume = signals["volume"].to_numpy()
+    for buy, sell, mv in configs:
+        side = np.zeros(len(signals))
+        side[(delta > buy) & (volume >= mv)] = 1
+        side[(delta < sell) & (volume >= mv)] = -1
+        trade = (side != 0) & ~np.isnan(returns)
+        r = side[trade] * returns[trade]
+        rows.append((trade.sum(), (r > 0).mean() if len(r) else np.nan, r.sum()))
+    return rows
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--days", type=int, default=60)
+    ap.add_argument("--tickers", type=int, default=50)
+    ap.add_argument("--per-hour", type=int, default=50)
+    ap.add_argument("--buy", type=grid_arg, default=grid_arg("0:0.5:0.01"))
+    ap.add_argument("--sell", type=grid_arg, default=grid_arg("-0.5:0:0.01"))
+    ap.add_argument("--min-volume", type=grid_arg, default=grid_arg("1:10:1"))
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    hours = args.days * 24
+    start = pd.Timestamp("2024-01-01", tz="UTC")
+    signals = compute_signals(synthetic_scored(hours * args.per_hour, args.tickers, hours, start, rng))
+    prices = synthetic_prices(args.tickers, hours, start, rng)
+
+    t = time.perf_counter()
+    returns = forward_returns(signals, prices)
+    ret_s = time.perf_counter() - t
+
+    t = time.perf_counter()
+    results = sweep(signals, returns, args.buy, args.sell, args.min_volume)
+    sweep_s = time.perf_counter() - t
+
+    sample = results.sample(200, random_state=0) if len(results) > 200 else results
+    configs = list(sample[["buy_delta", "sell_delta", "min_volume"]].itertuples(index=False, name=None))
+    t = time.perf_counter()
+    expected = loop_sweep(signals, returns, configs)
+    loop_s = (time.perf_counter() - t) / len(configs) * len(results)
+
+    for (trades, hit_rate, total), (_, row) in zip(expected, sample.iterrows()):
+        assert trades == row["trades"]
+        assert np.isclose(hit_rate, row["hit_rate"], equal_nan=True)
+        assert np.isclose(total, row["total_return"])
+    print(f"{len(configs)} sampled configs match the per-config loop")
+
+    print(f"{len(signals)} ticker-hours, {np.isfinite(returns).sum()} with forward returns ({ret_s:.2f}s)")
+    print(f"sweep: {len(results)} configs in {sweep_s:.2f}s  per-config loop (extrapolated): {loop_s:.1f}s")
+
+if __name__ == "__main__":
+    main()
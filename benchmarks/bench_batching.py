@@ -0,0 +1,57 @@
+"""
+Throughput of fixed-size batching vs length-bucketed token-budget batching.
+
+    python -m benchmarks.bench_batching --model ProsusAI/finbert --n 2000
+"""
+import argparse
+import random
+import time
+
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from src.nlp.sentiment import MAX_BATCH_TOKENS, MODEL_NAME, score_texts
+
+WORDS = (
+    "apple tesla nvidia shares stock market earnings beat miss guidance rise fall "
+    "analysts said the company quarter revenue outlook investors rally slump record"
+).split()
+
+def synthetic_corpus(n, seed=0):
+    """Mostly short RSS headlines with a tail of long NewsAPI-style bodies."""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        words = rng.randint(8, 20) if rng.random() < 0.7 else rng.randint(80, 300)
+        texts.append(" ".join(rng.choice(WORDS) for _ in range(words)))
+    return texts
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default=MODEL_NAME)
+    ap.add_argument("--n", type=int, default=1000)
+    ap.add_argument("--max-tokens", type=int, default=MAX_BATCH_TOKENS)
+    args = ap.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForSequenceClassification.from_pretrained(args.model)
+    model.eval()
+    texts = synthetic_corpus(args.n)
+
+    # warm up so the first path does not pay one-off allocation costs
+    score_texts(texts[:32], tokenizer, model)
+
+    fixed = timed(lambda: score_texts(texts, tokenizer, model))
+    bucketed = timed(lambda: score_texts(texts, tokenizer, model, max_tokens=args.max_tokens))
+
+    print(f"{'mode':<10} {'seconds':>8} {'articles/s':>11}")
+    print(f"{'fixed':<10} {fixed:>8.2f} {args.n / fixed:>11.1f}")
+    print(f"{'bucketed':<10} {bucketed:>8.2f} {args.n / bucketed:>11.1f}")
+    print(f"speedup: {fixed / bucketed:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Lexicon -> model cascade against the model alone on a held-out sample:
+for each confidence threshold, the share the lexicon answers, throughput,
+and agreement with the model's labels (score within +-band is neutral).
+
+The sample is drawn from the mapped table when there is one (run from the
+project directory), else from the synthetic corpus. Agreement only means
+something with the real model:
+
+    python -m benchmarks.bench_cascade --model "$FINBERT_PATH" --sample 2000
+    python -m benchmarks.bench_cascade --model tiny  # timings only
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import news_rows
+from benchmarks.tiny_model import tiny_bert
+from src.nlp.lexicon import lexicon_scores
+from src.nlp.sentiment import MAPPED, MAX_BATCH_TOKENS, MAX_LENGTH, MODEL_PATH, load_model, score_texts
+from src.nlp.text import canonical_texts, mapped_texts
+from src.storage import read_table, table_exists
+
+def held_out(n, seed=0):
+    """n distinct canonical texts, sampled from the mapped table if it exists."""
+    if table_exists(MAPPED):
+        texts, source = list(dict.fromkeys(mapped_texts(read_table(MAPPED)))), MAPPED
+    else:
+        texts, source = list(dict.fromkeys(canonical_texts(news_rows(n * 2, seed=seed)))), "synthetic corpus"
+    rng = np.random.default_rng(seed)
+    pick = rng.choice(len(texts), min(n, len(texts)), replace=False)
+    return [texts[i] for i in pick], source
+
+def labels(scores, band):
+    return np.where(np.abs(scores) < band, 0, np.sign(scores))
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default=MODEL_PATH, help="model directory or name; 'tiny' for a random tiny BERT")
+    ap.add_argument("--sample", type=int, default=2000)
+    ap.add_argument("--thresholds", default="0.5,0.6,0.7,0.8,0.9")
+    ap.add_argument("--band", type=float, default=0.3, help="|score| below this counts as neutral")
+    args = ap.parse_args()
+
+    texts, source = held_out(args.sample)
+    tokenizer, model = load_model("torch", tiny_bert() if args.model == "tiny" else args.model)
+    score = lambda batch: score_texts(batch, tokenizer, model, max_length=MAX_LENGTH, max_tokens=MAX_BATCH_TOKENS)
+    score(texts[:64])
+
+    (ref, _), model_s = timed(lambda: score(texts))
+    ref = np.array(ref)
+    (lex, lex_conf), lex_s = timed(lambda: lexicon_scores(texts))
+    lex, lex_conf = np.array(lex), np.array(lex_conf)
+    ref_labels = labels(ref, args.band)
+    print(f"{len(texts)} held-out articles from the {source}")
+    print(f"model alone: {model_s:.2f}s ({len(texts) / model_s:.0f} articles/s); lexicon: {lex_s * 1e6 / len(texts):.1f} us per article\n")
+
+    print(f"{'threshold':>9} {'lexicon':>8} {'articles/s':>11} {'speedup':>8} {'agree':>7} {'lexicon agree':>14} {'MAE':>6}")
+    for threshold in (float(t) for t in args.thresholds.split(",")):
+        escalate = np.flatnonzero(lex_conf < threshold)
+        cascade = lex.copy()
+        (scores, _), esc_s = timed(lambda: score([texts[i] for i in escalate])) if len(escalate) else (([], []), 0.0)
+        cascade[escalate] = scores
+        secs = lex_s + esc_s
+
+        answered = np.ones(len(texts), dtype=bool)
+        answered[escalate] = False
+        agree = labels(cascade, args.band) == ref_labels
+        lex_agree = f"{agree[answered].mean():.1%}" if answered.any() else "-"
+        print(f"{threshold:>9.2f} {answered.mean():>8.1%} {len(texts) / secs:>11.0f} {model_s / secs:>7.2f}x "
+              f"{agree.mean():>7.1%} {lex_agree:>14} {np.abs(cascade - ref).mean():>6.3f}")
+
+if __name__ == "__main__":
+    main()
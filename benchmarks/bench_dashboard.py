@@ -0,0 +1,73 @@
+"""
+Dashboard data work per widget interaction, before and after the cached
+views: the old script re-read the signals table and recomputed everything
+on every rerun; now a rerun is a lookup into views built once per file.
+
+    python -m benchmarks.bench_dashboard --days 30,90,365
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_signals import synthetic_scored
+from dashboard.views import LOCAL_TZ, build_views
+from src.signals.make_signals import compute_signals
+
+def legacy_rerun(path, ticker):
+    """What dashboard/app.py did on each rerun before the cache."""
+    df = pd.read_parquet(path)
+    latest_by_ticker = (
+        df.sort_values("hour")
+          .groupby("ticker", as_index=False, observed=True)
+          .tail(1)
+          .sort_values("avg_sentiment", ascending=False)
+    )
+    window_articles = df.groupby("ticker", observed=True)["volume"].sum().rename("articles_window").reset_index()
+    latest_by_ticker = latest_by_ticker.merge(window_articles, on="ticker", how="left")
+
+    sub = df[df["ticker"] == ticker].sort_values("hour").copy()
+    sub["time_local"] = sub["hour"].dt.tz_convert(LOCAL_TZ).dt.strftime("%b %d, %I %p")
+    sub.iloc[-1], int(sub["volume"].sum()), int(sub["hour"].nunique())
+    sub.sort_values("hour", ascending=False).head(30).copy()
+
+def cached_rerun(views, ticker):
+    views["overview"]
+    view = views["tickers"][ticker]
+    view["latest"], view["articles_window"], view["hours_tracked"], view["history"]
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--days", default="30,90,365", help="history lengths to try")
+    ap.add_argument("--tickers", type=int, default=50)
+    ap.add_argument("--per-hour", type=int, default=30)
+    args = ap.parse_args()
+
+    print(f"{'days':>5} {'rows':>8} {'legacy ms':>10} {'build ms':>9} {'cached ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "signals_latest.parquet")
+        for days in (int(d) for d in args.days.split(",")):
+            hours = days * 24
+            scored = synthetic_scored(hours * args.per_hour, args.tickers, hours, pd.Timestamp("2024-01-01", tz="UTC"), np.random.default_rng(0))
+            signals = compute_signals(scored)
+            signals.to_parquet(path, index=False)
+
+            legacy = timed(lambda: legacy_rerun(path, "T1"))
+            build = timed(lambda: build_views(pd.read_parquet(path)), repeat=1)
+            views = build_views(pd.read_parquet(path))
+            cached = timed(lambda: cached_rerun(views, "T1"))
+            print(f"{days:>5} {len(signals):>8} {legacy * 1000:>10.1f} {build * 1000:>9.1f} {cached * 1000:>10.3f}")
+
+if __name__ == "__main__":
+    main()
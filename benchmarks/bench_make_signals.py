@@ -0,0 +1,86 @@
+"""
+compute_signals before and after the single-pass rewrite: wall time and
+peak traced memory on a typed sentiment table, plus an exact equality check.
+
+    python -m benchmarks.bench_make_signals --days 90 --tickers 100
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_signals import synthetic_scored
+from src.signals.make_signals import classify, compute_signals, hour_bucket
+from src.storage import typed
+
+def legacy_compute_signals(df):
+    """compute_signals as it was before the single-pass rewrite."""
+    df = df.copy()
+    df["hour"] = hour_bucket(df)
+
+    tmp = df.copy()
+    tmp["abs_sent"] = tmp["sentiment_score"].abs()
+
+    rep = (
+        tmp.sort_values(["ticker", "hour", "abs_sent"], ascending=[True, True, False])
+        .groupby(["ticker", "hour"], as_index=False, observed=True)
+        .head(1)[["ticker", "hour", "title", "url", "sentiment_score"]]
+        .rename(columns={
+            "title": "rep_title",
+            "url": "rep_url",
+            "sentiment_score": "rep_article_sentiment"
+        })
+    )
+
+    agg = (
+        df.groupby(["hour", "ticker"], observed=True)
+          .agg(avg_sentiment=("sentiment_score", "mean"),
+               volume=("sentiment_score", "count"))
+          .reset_index()
+          .sort_values(["ticker", "hour"])
+    )
+
+    agg["sentiment_delta"] = agg.groupby("ticker", observed=True)["avg_sentiment"].diff()
+    agg = classify(agg)
+    return agg.merge(rep, on=["ticker", "hour"], how="left")
+
+def profile(fn, df, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn(df)
+        best = min(best, time.perf_counter() - t)
+
+    tracemalloc.start()
+    fn(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--tickers", type=int, default=100)
+    ap.add_argument("--per-hour", type=int, default=50, help="scored rows per hour")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    hours = args.days * 24
+    rng = np.random.default_rng(0)
+    df = typed(synthetic_scored(hours * args.per_hour, args.tickers, hours, pd.Timestamp("2024-01-01", tz="UTC"), rng))
+    print(f"{len(df)} scored rows, {df['ticker'].nunique()} tickers, {hours} hours")
+
+    print(f"{'version':<10} {'best s':>8} {'peak MB':>8}")
+    results = {}
+    for name, fn in [("legacy", legacy_compute_signals), ("single", compute_signals)]:
+        secs, peak, out = profile(fn, df, args.repeat)
+        results[name] = out
+        print(f"{name:<10} {secs:>8.3f} {peak / 1e6:>8.1f}")
+
+    pd.testing.assert_frame_equal(results["single"], results["legacy"], check_categorical=False)
+    print("outputs identical")
+
+if __name__ == "__main__":
+    main()
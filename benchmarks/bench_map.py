@@ -0,0 +1,116 @@
+"""
+Timing harness for ticker mapping: the original iterrows loop vs the
+columnar map_frame. Also checks the two write byte-identical CSVs.
+
+    python -m benchmarks.bench_map --rows 100000
+"""
+import argparse
+import io
+import random
+import time
+
+import pandas as pd
+
+from src.config import ALIASES, WATCHLIST
+from src.nlp.cache import text_key
+from src.nlp.text import canonical_text
+from src.scrape.map_tickers import build_patterns, map_frame
+
+def legacy_map_frame(df):
+    """
+    The mapper as it was before the columnar rewrite, one row and one pattern
+    at a time, brought up to the current output: matched on the canonical
+    text, which replaces text, plus its text_key.
+    """
+    patterns = build_patterns()
+    rows = []
+
+    for _, r in df.iterrows():
+        text = canonical_text(r.get("title", ""), r.get("summary", ""), r.get("text", ""))
+        if not text:
+            continue
+
+        matched = []
+        for ticker, rx in patterns.items():
+            if rx.search(text):
+                matched.append(ticker)
+
+        for t in matched:
+            rows.append({
+                "timestamp_utc": r.get("timestamp_utc"),
+                "source": r.get("source", ""),
+                "published_utc": r.get("published_utc", ""),
+                "ticker": t,
+                "title": r.get("title", ""),
+                "summary": r.get("summary", ""),
+                "text": text,
+                "text_key": text_key(text),
+                "url": r.get("url", "")
+            })
+
+    return pd.DataFrame(rows)
+
+def synthetic_raw(n, seed=0):
+    """
+    Combined raw frame shaped like map_all_raw's: RSS rows (scraped_utc,
+    no timestamp_utc) mixed with NewsAPI rows, some missing summaries.
+    """
+    rng = random.Random(seed)
+    names = [a for t in WATCHLIST for a in [t, f"${t}"] + ALIASES.get(t, [])]
+    filler = "stocks rallied as investors weighed earnings guidance and rate cut bets".split()
+    now = pd.Timestamp("2024-06-01", tz="UTC")
+    rows = []
+
+    for i in range(n):
+        words = [rng.choice(filler) for _ in range(rng.randint(6, 14))]
+        for _ in range(rng.choice([0, 0, 1, 1, 2, 3])):
+            words.insert(rng.randrange(len(words)), rng.choice(names))
+        title = " ".join(words).capitalize()
+        summary = None if rng.random() < 0.2 else " ".join(rng.choice(filler) for _ in range(20))
+        published = now - pd.Timedelta(minutes=rng.randint(0, 120 * 60))
+        row = {
+            "published_utc": None if rng.random() < 0.05 else published.isoformat(),
+            "source": rng.choice(["YahooFinance", "MarketWatch", "Reuters"]),
+            "title": title,
+            "summary": summary,
+            "text": f"{title} {summary or ''}".strip(),
+            "url": f"https://example.com/{i}",
+        }
+        if rng.random() < 0.5:
+            row["scraped_utc"] = now.isoformat()
+        else:
+            row["timestamp_utc"] = now.isoformat()
+        rows.append(row)
+
+    df = pd.DataFrame(rows)
+    df["published_utc"] = pd.to_datetime(df["published_utc"], utc=True, errors="coerce")
+    return df
+
+def to_csv_bytes(df):
+    buf = io.StringIO()
+    df.to_csv(buf, index=False)
+    return buf.getvalue().encode()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20000)
+    args = ap.parse_args()
+
+    df = synthetic_raw(args.rows)
+
+    start = time.perf_counter()
+    old = legacy_map_frame(df)
+    old_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = map_frame(df)
+    new_s = time.perf_counter() - start
+
+    identical = to_csv_bytes(old) == to_csv_bytes(new)
+    print(f"raw rows: {len(df)}, mapped rows: {len(new)}, byte-identical: {identical}")
+    print(f"iterrows: {old_s:.2f}s  columnar: {new_s:.2f}s  speedup: {old_s / new_s:.1f}x")
+    if not identical:
+        raise SystemExit("columnar map_frame output differs from the iterrows version")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Per-ticker regex loop vs single-pass TickerMatcher as the watchlist grows.
+
+    python -m benchmarks.bench_matcher --texts 500
+"""
+import argparse
+import random
+import string
+import time
+
+from src.config import ALIASES, WATCHLIST
+from src.scrape.map_tickers import TickerMatcher, build_patterns
+
+def synthetic_watchlist(n, seed=0):
+    """The real watchlist plus made-up symbols with one or two aliases each."""
+    rng = random.Random(seed)
+    watchlist = list(WATCHLIST)
+    aliases = {t: list(a) for t, a in ALIASES.items()}
+    seen = set(watchlist)
+
+    while len(watchlist) < n:
+        t = "".join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(2, 5)))
+        if t in seen:
+            continue
+        seen.add(t)
+        watchlist.append(t)
+        aliases[t] = [
+            " ".join("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))) for _ in range(rng.randint(1, 2)))
+            for _ in range(rng.randint(1, 2))
+        ]
+    return watchlist, aliases
+
+def synthetic_texts(n, watchlist, aliases, seed=0):
+    rng = random.Random(seed)
+    filler = "shares rose after the company reported quarterly earnings above analyst estimates".split()
+    texts = []
+    for _ in range(n):
+        words = [rng.choice(filler) for _ in range(rng.randint(10, 40))]
+        for _ in range(rng.randint(0, 3)):
+            t = rng.choice(watchlist)
+            words.insert(rng.randrange(len(words)), rng.choice([t, f"${t}", f"({t})"] + aliases.get(t, [])))
+        texts.append(" ".join(words))
+    # characters IGNORECASE folds but str.lower() does not (long s, Kelvin sign)
+    texts += ["Teſla jumps", "Microſoft and AMAZON rally", "\u212aO shares (IN\u212a)", "$tſla ſlips"]
+    return texts
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--texts", type=int, default=500)
+    ap.add_argument("--sizes", default="13,100,500,1000,5000")
+    args = ap.parse_args()
+
+    print(f"{'tickers':>7} {'loop s':>8} {'single s':>9} {'speedup':>8}")
+
+    for size in [int(x) for x in args.sizes.split(",")]:
+        watchlist, aliases = synthetic_watchlist(size)
+        texts = synthetic_texts(args.texts, watchlist, aliases)
+
+        start = time.perf_counter()
+        patterns = build_patterns(watchlist, aliases)
+        loop = [[t for t, rx in patterns.items() if rx.search(text)] for text in texts]
+        loop_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matcher = TickerMatcher(watchlist, aliases)
+        single = [matcher.find(text) for text in texts]
+        single_s = time.perf_counter() - start
+
+        assert loop == single, f"matcher disagrees with per-ticker patterns at {size} tickers"
+        print(f"{size:>7} {loop_s:>8.3f} {single_s:>9.3f} {loop_s / single_s:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+NewsAPI request planning against the local stub: one query per ticker with
+a single page (the old scraper), one query per ticker with pagination, and
+alias ORs packed up to the query length limit with pagination. A share of
+tickers is busy, with more results than one page holds.
+
+    python -m benchmarks.bench_newsapi --tickers 500 --busy 0.05
+"""
+import argparse
+import random
+
+from benchmarks.bench_matcher import synthetic_watchlist
+from benchmarks.stub_server import NEWSAPI_PER_TERM, StubHandler, serve
+from src.scrape.fetch import Fetcher
+from src.scrape.news_api import MAX_PAGES, scrape_watchlist
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tickers", type=int, default=500)
+    ap.add_argument("--busy", type=float, default=0.05, help="share of tickers with more than a page of results")
+    ap.add_argument("--busy-results", type=int, default=250)
+    args = ap.parse_args()
+
+    names, aliases = synthetic_watchlist(args.tickers)
+    watchlist = {t: aliases[t] for t in names}
+    rng = random.Random(0)
+    busy = set(rng.sample(names, int(len(names) * args.busy)))
+    counts = {a: args.busy_results for t in busy for a in watchlist[t]}
+    terms = {a for a in (a for v in watchlist.values() for a in v)}
+    available = sum(counts.get(a, NEWSAPI_PER_TERM) for a in terms)
+    # what MAX_PAGES lets through per busy term when it has a query to itself
+    reachable = sum(min(counts.get(a, NEWSAPI_PER_TERM), MAX_PAGES * 100) for a in terms)
+
+    modes = {
+        "per ticker, 1 page": {"max_tickers": 1, "max_pages": 1},
+        "per ticker, paged": {"max_tickers": 1},
+        "packed, paged": {},
+    }
+    print(f"{len(watchlist)} tickers ({len(busy)} busy), {available} articles available, {reachable} within MAX_PAGES\n")
+    table = []
+    for label, kwargs in modes.items():
+        with serve() as base:
+            StubHandler.newsapi_counts = counts
+            fetcher = Fetcher(concurrency=8, rps=0)
+            df = scrape_watchlist(watchlist, fetcher=fetcher, base_url=f"{base}/v2/everything", **kwargs)
+            table.append((label, StubHandler.requests_served, len(df)))
+        print()
+
+    print(f"{'planner':<20} {'requests':>9} {'articles':>9} {'per req':>8} {'coverage':>9}")
+    for label, n, got in table:
+        print(f"{label:<20} {n:>9} {got:>9} {got / n:>8.1f} {got / available:>9.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Dashboard rendering: the old iterrows HTML builders vs the column-wise
+ones (identical HTML is asserted), one page vs the whole overview, and LTTB
+downsampling of a long sentiment series.
+
+    python -m benchmarks.bench_render --tickers 5000 --days 90
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from dashboard.render import HISTORY_HEADER, SIGNALS_HEADER, _table, history_table_html, lttb, page, signals_table_html
+
+def legacy_signals_rows(df_latest):
+    """Row loop from the old latest_signals_table."""
+    rows_html = []
+    for _, r in df_latest.iterrows():
+        sig = r.get("signal", "HOLD")
+        sig_class = "sig-hold"
+        if sig == "BUY":
+            sig_class = "sig-buy"
+        elif sig == "SELL":
+            sig_class = "sig-sell"
+
+        delta = r.get("sentiment_delta")
+        delta_str = "" if pd.isna(delta) else f"{delta:.3f}"
+
+        rows_html.append(
+            f"<tr>"
+            f"<td class='col-ticker'><b>{r.get('ticker','')}</b></td>"
+            f"<td class='col-avg'>{float(r.get('avg_sentiment', 0)):.3f}</td>"
+            f"<td class='col-vol'>{int(r.get('articles_window', 0))}</td>"
+            f"<td class='col-delta'>{delta_str}</td>"
+            f"<td class='col-signal'><span class='{sig_class}'>{sig}</span></td>"
+            f"<td class='col-conf'>{float(r.get('confidence', 0)):.2f}</td>"
+            f"</tr>"
+        )
+    return _table(SIGNALS_HEADER, pd.Series(rows_html, dtype=object))
+
+def legacy_history_rows(df_hist):
+    """Row loop from the old history_table_with_links."""
+    rows_html = []
+    for _, r in df_hist.iterrows():
+        title = (r.get("rep_title") or "").replace('"', "&quot;")
+        url = r.get("rep_url") or ""
+        link = f'<a href="{url}" target="_blank" rel="noopener noreferrer">{title}</a>' if url else title
+
+        delta = r.get("sentiment_delta")
+        delta_str = "" if pd.isna(delta) else f"{delta:.3f}"
+
+        rows_html.append(
+            f"<tr>"
+            f"<td class='col-time'>{r.get('time_local','')}</td>"
+            f"<td class='col-avg'>{float(r.get('avg_sentiment', 0)):.3f}</td>"
+            f"<td class='col-delta'>{delta_str}</td>"
+            f"<td class='col-signal'><b>{r.get('signal','')}</b></td>"
+            f"<td class='col-headline'>{link}</td>"
+            f"</tr>"
+        )
+    return _table(HISTORY_HEADER, pd.Series(rows_html, dtype=object))
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t)
+    return best, out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tickers", type=int, default=5000)
+    ap.add_argument("--days", type=int, default=90, help="hourly points in the chart series")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.tickers
+    overview = pd.DataFrame({
+        "ticker": pd.Categorical([f"T{i}" for i in range(n)]),
+        "avg_sentiment": rng.uniform(-1, 1, n),
+        "volume": rng.integers(1, 20, n),
+        "articles_window": rng.integers(1, 500, n),
+        "sentiment_delta": np.where(rng.random(n) < 0.1, np.nan, rng.normal(0, 0.3, n)),
+        "signal": rng.choice(["BUY", "SELL", "HOLD"], n),
+        "confidence": rng.uniform(0, 1, n),
+    })
+    history = pd.DataFrame({
+        "time_local": [f"Jun {i % 28 + 1:02d}, {i % 12 + 1:02d} PM" for i in range(n)],
+        "avg_sentiment": rng.uniform(-1, 1, n),
+        "sentiment_delta": np.where(rng.random(n) < 0.1, np.nan, rng.normal(0, 0.3, n)),
+        "signal": rng.choice(["BUY", "SELL", "HOLD"], n),
+        "rep_title": [f'Story "{i}" moves shares' for i in range(n)],
+        "rep_url": np.where(rng.random(n) < 0.1, None, [f"https://example.com/{i}" for i in range(n)]),
+    })
+
+    print(f"{'view':<22} {'rows':>6} {'iterrows ms':>12} {'columns ms':>11}")
+    for name, legacy, fast, df in [
+        ("latest signals", legacy_signals_rows, signals_table_html, overview),
+        ("history", legacy_history_rows, history_table_html, history),
+    ]:
+        old_s, old = timed(lambda: legacy(df))
+        new_s, new = timed(lambda: fast(df))
+        assert old == new, f"{name}: HTML differs"
+        print(f"{name:<22} {len(df):>6} {old_s * 1000:>12.1f} {new_s * 1000:>11.1f}")
+
+    page_s, _ = timed(lambda: signals_table_html(page(overview, 1)))
+    print(f"{'latest signals, page 1':<22} {len(page(overview, 1)):>6} {'':>12} {page_s * 1000:>11.2f}")
+
+    hours = args.days * 24
+    x = pd.date_range("2024-01-01", periods=hours, freq="h", tz="UTC").asi8
+    y = np.cumsum(rng.normal(0, 0.05, hours))
+    lttb_s, idx = timed(lambda: lttb(x, y))
+    print(f"LTTB: {hours} points -> {len(idx)} in {lttb_s * 1000:.1f} ms "
+          f"(min/max kept: {y[idx].min() == y.min()}/{y[idx].max() == y.max()})")
+
+if __name__ == "__main__":
+    main()
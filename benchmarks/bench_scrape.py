@@ -0,0 +1,59 @@
+"""
+Sequential vs concurrent scraping against the local stub server.
+
+    python -m benchmarks.bench_scrape --latency 0.2 --feeds 10
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.stub_server import StubHandler, serve
+from src.config import ALIASES
+from src.scrape.fetch import Fetcher
+from src.scrape.news_api import scrape_watchlist
+from src.scrape.news_rss import fetch_rss
+from src.scrape.store import ArticleStore
+
+def run(base, feeds, fetcher):
+    start = time.perf_counter()
+    rss, _ = fetch_rss(feeds, fetcher=fetcher)
+    api = scrape_watchlist(ALIASES, fetcher=fetcher, base_url=f"{base}/v2/everything")
+    return time.perf_counter() - start, len(rss), len(api)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency", type=float, default=0.2, help="stub response delay in seconds")
+    ap.add_argument("--feeds", type=int, default=10)
+    ap.add_argument("--concurrency", type=int, default=8)
+    args = ap.parse_args()
+
+    with serve(latency=args.latency) as base:
+        # one feed fails twice before answering, to exercise retry/backoff
+        feeds = {f"Feed{i}": f"{base}/rss/feed{i}" for i in range(args.feeds)}
+        feeds["Flaky"] = f"{base}/flaky/2/rss/flaky"
+
+        # all stub urls share one host, so lift the per-host limit for timing
+        seq = run(base, feeds, Fetcher(concurrency=1, rps=0, backoff=0.05))
+        StubHandler.failures = {}
+        conc = run(base, feeds, Fetcher(concurrency=args.concurrency, rps=0, backoff=0.05))
+
+    print(f"{'mode':<11} {'seconds':>8} {'rss rows':>9} {'api rows':>9}")
+    print(f"{'sequential':<11} {seq[0]:>8.2f} {seq[1]:>9} {seq[2]:>9}")
+    print(f"{'concurrent':<11} {conc[0]:>8.2f} {conc[1]:>9} {conc[2]:>9}")
+    print(f"speedup: {seq[0] / conc[0]:.1f}x")
+
+    # conditional GET: the second pass should be all 304s and no new rows
+    with tempfile.TemporaryDirectory() as tmp, serve(latency=args.latency) as base:
+        store = ArticleStore(os.path.join(tmp, "articles.sqlite"))
+        feeds = {f"Feed{i}": f"{base}/rss/feed{i}" for i in range(args.feeds)}
+        fetcher = Fetcher(concurrency=args.concurrency, rps=0)
+        for label in ("cold", "warm"):
+            before = StubHandler.requests_served
+            df, pending = fetch_rss(feeds, fetcher=fetcher, state=store)
+            store.add(df, pending)
+            print(f"{label}: {StubHandler.requests_served - before} requests, {len(df)} rows emitted")
+        store.close()
+
+if __name__ == "__main__":
+    main()
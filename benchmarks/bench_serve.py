@@ -0,0 +1,170 @@
+"""
+Load test for the signals query service: in-process query latency of the
+SignalIndex, then p50/p99 latency and QPS over HTTP with keep-alive
+clients, while the signals file is rewritten to exercise hot reloads.
+
+    python -m benchmarks.bench_serve --tickers 500 --hours 120 --clients 8 --seconds 10
+    python -m benchmarks.bench_serve --url http://127.0.0.1:8765  # a running python -m src.serve
+"""
+import argparse
+import http.client
+import os
+import random
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from src.serve import SignalService, make_server
+from src.signals.make_signals import SIGNALS, classify
+from src.storage import table_mtime, write_table
+
+def synthetic_signals(tickers, hours, seed=0, end=None):
+    rng = np.random.default_rng(seed)
+    end = end or pd.Timestamp.now(tz="UTC").floor("h")
+    hour = pd.date_range(end=end, periods=hours, freq="h")
+    names = [f"T{i:04d}" for i in range(tickers)]
+    n = tickers * hours
+    df = pd.DataFrame({
+        "hour": np.tile(hour, tickers),
+        "ticker": pd.Categorical(np.repeat(names, hours)),
+        "avg_sentiment": rng.uniform(-1, 1, n),
+        "volume": rng.integers(1, 12, n),
+    })
+    df["sentiment_delta"] = df.groupby("ticker", observed=True)["avg_sentiment"].diff()
+    df = classify(df)
+    df["rep_title"] = [f"Story {i}" for i in range(n)]
+    df["rep_url"] = [f"https://example.com/{i}" for i in range(n)]
+    df["rep_article_sentiment"] = rng.uniform(-1, 1, n)
+    return df
+
+def percentiles(ms):
+    return np.percentile(ms, 50), np.percentile(ms, 99)
+
+def queries(names, end, rng):
+    """One request path of each kind."""
+    pick = ",".join(rng.sample(names, min(5, len(names))))
+    day_ago = (end - pd.Timedelta(hours=24)).strftime("%Y-%m-%dT%H:%MZ")
+    return {
+        "latest": f"/latest?tickers={pick}",
+        "range": f"/range?ticker={rng.choice(names)}&start={day_ago}",
+        "actions": f"/actions?since={(end - pd.Timedelta(hours=2)).strftime('%Y-%m-%dT%H:%MZ')}&signal=BUY",
+    }
+
+def in_process(index, names, end, reps=2000):
+    rng = random.Random(0)
+    day_ago = (end - pd.Timedelta(hours=24)).value
+    recent = (end - pd.Timedelta(hours=2)).value
+    cases = {
+        "latest": lambda: index.latest(rng.sample(names, min(5, len(names)))),
+        "range": lambda: index.range(rng.choice(names), day_ago),
+        "actions": lambda: index.since(recent, "BUY"),
+    }
+    print(f"{'in-process':<12} {'p50 us':>8} {'p99 us':>8}")
+    for name, fn in cases.items():
+        times = []
+        for _ in range(reps):
+            start = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - start) * 1e6)
+        p50, p99 = percentiles(times)
+        print(f"{name:<12} {p50:>8.1f} {p99:>8.1f}")
+
+def client(base, names, end, deadline, out, seed):
+    rng = random.Random(seed)
+    parts = urlsplit(base)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port)
+    while time.perf_counter() < deadline:
+        for kind, path in queries(names, end, rng).items():
+            start = time.perf_counter()
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            resp.read()
+            out.append((kind, (time.perf_counter() - start) * 1000, resp.status))
+    conn.close()
+
+def load(base, names, end, clients, seconds):
+    results = []
+    deadline = time.perf_counter() + seconds
+    threads = [threading.Thread(target=client, args=(base, names, end, deadline, results, i)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    df = pd.DataFrame(results, columns=["kind", "ms", "status"])
+    print(f"\nHTTP, {clients} clients for {elapsed:.1f}s: {len(df)} requests, {len(df) / elapsed:.0f} QPS, "
+          f"{(df['status'] != 200).sum()} non-200")
+    print(f"{'endpoint':<12} {'p50 ms':>8} {'p99 ms':>8}")
+    for kind, sub in df.groupby("kind", sort=False):
+        p50, p99 = percentiles(sub["ms"])
+        print(f"{kind:<12} {p50:>8.2f} {p99:>8.2f}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tickers", type=int, default=500)
+    ap.add_argument("--hours", type=int, default=120)
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--reload-every", type=float, default=2.0, help="rewrite the signals file this often (0: never)")
+    ap.add_argument("--url", default=None, help="load-test a running server instead (its tickers are read from /latest)")
+    args = ap.parse_args()
+
+    if args.url:
+        import json
+        import urllib.request
+        with urllib.request.urlopen(f"{args.url}/latest") as resp:
+            latest = json.load(resp)["signals"]
+        names = sorted(latest)
+        end = max(pd.Timestamp(r["hour"]) for r in latest.values())
+        load(args.url, names, end, args.clients, args.seconds)
+        return
+
+    df = synthetic_signals(args.tickers, args.hours)
+    names = df["ticker"].cat.categories.tolist()
+    end = df["hour"].max()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            write_table(df, SIGNALS, export_csv=False)
+            service = SignalService(interval=0.2)
+            print(f"index of {service.index.rows} rows ({args.tickers} tickers x {args.hours} hours)")
+            in_process(service.index, names, end)
+
+            server = make_server(service, port=0)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            threading.Thread(target=service.reload_loop, daemon=True).start()
+
+            stop = threading.Event()
+
+            def rewrite():
+                seed = 1
+                while args.reload_every and not stop.wait(args.reload_every):
+                    write_table(synthetic_signals(args.tickers, args.hours, seed, end), SIGNALS, export_csv=False)
+                    seed += 1
+
+            writer = threading.Thread(target=rewrite, daemon=True)
+            writer.start()
+            load(f"http://127.0.0.1:{server.server_address[1]}", names, end, args.clients, args.seconds)
+            stop.set()
+            writer.join()
+            # let the reload loop pick up the last rewrite
+            while service.index.mtime != table_mtime(SIGNALS):
+                time.sleep(0.05)
+            print(f"hot reloads: {service.reloads}")
+
+            server.shutdown()
+            server.server_close()
+            service.stop.set()
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    main()
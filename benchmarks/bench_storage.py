@@ -0,0 +1,64 @@
+"""
+CSV vs typed Parquet for a mapped-news sized table: write/read time and size.
+
+    python -m benchmarks.bench_storage --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.config import WATCHLIST
+from src.storage import typed
+
+def synthetic_mapped(n, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-06-01", tz="UTC")
+    published = start + pd.to_timedelta(rng.integers(0, 120 * 3600, n), unit="s")
+    ids = rng.integers(0, n // 2 + 1, n)
+    return pd.DataFrame({
+        "timestamp_utc": (published + pd.Timedelta(minutes=5)).astype(str),
+        "source": rng.choice(["YahooFinance", "MarketWatch", "Reuters", "Bloomberg"], n),
+        "published_utc": published.astype(str),
+        "ticker": rng.choice(WATCHLIST, n),
+        "title": [f"Headline {i} about markets" for i in ids],
+        "summary": [f"Summary text for story {i}, with some more words" for i in ids],
+        "text": [f"Headline {i} about markets Summary text for story {i}" for i in ids],
+        "url": [f"https://example.com/story/{i}" for i in ids],
+    })
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    raw = synthetic_mapped(args.rows)
+    df = typed(raw)
+
+    print(f"{'format':<8} {'write s':>8} {'read s':>8} {'MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "mapped.csv")
+        pq_path = os.path.join(tmp, "mapped.parquet")
+
+        # CSV readers have to re-parse timestamps and re-derive categories
+        w, _ = timed(lambda: df.to_csv(csv_path, index=False))
+        r, _ = timed(lambda: typed(pd.read_csv(csv_path)))
+        print(f"{'csv':<8} {w:>8.2f} {r:>8.2f} {os.path.getsize(csv_path) / 1e6:>8.1f}")
+
+        w, _ = timed(lambda: df.to_parquet(pq_path, index=False))
+        r, back = timed(lambda: pd.read_parquet(pq_path))
+        print(f"{'parquet':<8} {w:>8.2f} {r:>8.2f} {os.path.getsize(pq_path) / 1e6:>8.1f}")
+
+    assert back["published_utc"].dtype == df["published_utc"].dtype
+    assert isinstance(back["ticker"].dtype, pd.CategoricalDtype)
+
+if __name__ == "__main__":
+    main()
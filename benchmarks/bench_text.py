@@ -0,0 +1,50 @@
+"""
+Model inputs before and after canonical text: the old title + summary +
+text concatenation (text already repeats title + summary, and part of the
+summaries carry feed HTML) against canonical_text. Reports tokens per
+input, inputs at the max_length limit, and scoring time for each.
+
+    python -m benchmarks.bench_text --n 5000 --markup 0.3
+    FINBERT_PATH=... python -m benchmarks.bench_text --model "$FINBERT_PATH"
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import news_rows
+from benchmarks.tiny_model import tiny_bert
+from src.nlp.sentiment import MAX_BATCH_TOKENS, MAX_LENGTH, load_model, score_texts
+from src.nlp.text import canonical_texts, token_lengths
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=5000)
+    ap.add_argument("--markup", type=float, default=0.3, help="share of summaries that arrive as feed HTML")
+    ap.add_argument("--model", default=None, help="model directory (default: a tiny random BERT)")
+    args = ap.parse_args()
+
+    df = news_rows(args.n, markup_frac=args.markup)
+    old = (df["title"].fillna("") + " " + df["summary"].fillna("") + " " + df["text"].fillna("")).tolist()
+    start = time.perf_counter()
+    new = canonical_texts(df)
+    build = time.perf_counter() - start
+    print(f"canonical_text: {build / args.n * 1e6:.1f} us per article")
+
+    tokenizer, model = load_model("torch", args.model or tiny_bert())
+    score_texts(old[:64], tokenizer, model, max_length=MAX_LENGTH, max_tokens=MAX_BATCH_TOKENS)
+
+    rows = {}
+    for label, texts in (("title+summary+text", old), ("canonical", new)):
+        full = token_lengths(texts, tokenizer)
+        fed = full.clip(max=MAX_LENGTH)
+        start = time.perf_counter()
+        score_texts(texts, tokenizer, model, max_length=MAX_LENGTH, max_tokens=MAX_BATCH_TOKENS)
+        rows[label] = (full.mean(), fed.sum(), (full > MAX_LENGTH).mean(), time.perf_counter() - start)
+
+    print(f"\n{'input':<20} {'tokens':>7} {'fed':>9} {'truncated':>10} {'seconds':>8} {'articles/s':>11}")
+    for label, (mean, fed, cut, secs) in rows.items():
+        print(f"{label:<20} {mean:>7.1f} {fed:>9} {cut:>10.1%} {secs:>8.2f} {args.n / secs:>11.1f}")
+    (_, old_fed, _, old_s), (_, new_fed, _, new_s) = rows.values()
+    print(f"tokens fed to the model: -{1 - new_fed / old_fed:.0%}, scoring speedup {old_s / new_s:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Scaling curve for process-pool sentiment scoring.
+
+    python -m benchmarks.bench_workers --model /path/to/finbert --max-workers 32
+"""
+import argparse
+import os
+import time
+
+from transformers import AutoTokenizer
+
+from benchmarks.bench_batching import synthetic_corpus
+from src.nlp.sentiment import MAX_BATCH_TOKENS, MODEL_PATH, load_model, make_pool, score_texts
+
+def worker_counts(max_workers):
+    n = 1
+    while n < max_workers:
+        yield n
+        n *= 2
+    yield max_workers
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default=MODEL_PATH)
+    ap.add_argument("--backend", default="torch")
+    ap.add_argument("--n", type=int, default=2000)
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    texts = synthetic_corpus(args.n)
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+
+    # single process, all cores to torch: what main() does without --workers
+    _, model = load_model(args.backend, args.model)
+    score_texts(texts[:32], tokenizer, model)
+    start = time.perf_counter()
+    score_texts(texts, tokenizer, model, max_tokens=MAX_BATCH_TOKENS)
+    base = args.n / (time.perf_counter() - start)
+    del model
+
+    print(f"{'workers':>7} {'threads':>7} {'articles/s':>11} {'speedup':>8}")
+    print(f"{'1*':>7} {'all':>7} {base:>11.1f} {1.0:>8.2f}")
+
+    for workers in worker_counts(args.max_workers):
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        pool = make_pool(workers, args.backend, args.model, threads)
+        # every worker loads its model in the initializer; warm them all up
+        score_texts(texts[:workers * 16], tokenizer, None, pool=pool)
+
+        start = time.perf_counter()
+        score_texts(texts, tokenizer, None, max_tokens=MAX_BATCH_TOKENS, pool=pool)
+        rate = args.n / (time.perf_counter() - start)
+        pool.close()
+        pool.join()
+
+        print(f"{workers:>7} {threads:>7} {rate:>11.1f} {rate / base:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Local stand-in for the RSS feeds and NewsAPI, so the scrapers can be run and
+timed without network access or an API key.
+
+    with serve(latency=0.2) as base:
+        rows, _ = fetch_rss({"Stub": f"{base}/rss/stub"})
+        scrape_watchlist(ALIASES, base_url=f"{base}/v2/everything")
+
+Paths: /rss/<name> serves a canned feed (with an ETag; a matching
+If-None-Match gets 304), /v2/everything a paged NewsAPI-shaped JSON answer
+for the q parameter (400 when q is over 500 chars), /flaky/<n>/... fails n
+times with 503 before serving the rest of the path.
+"""
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ITEMS_PER_FEED = 30
+NEWSAPI_PER_TERM = 3
+NEWSAPI_MAX_QUERY = 500
+
+def _this_hour():
+    # recent enough to stay inside WINDOW_HOURS, stable enough for ETags
+    return datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+def rss_body(name, n=ITEMS_PER_FEED):
+    now = _this_hour()
+    items = "".join(
+        f"<item><title>{name} story {i}: Apple and Nvidia shares move</title>"
+        f"<link>https://example.com/{name}/{i}</link><guid>{name}-{i}</guid>"
+        f"<description>&lt;p&gt;Summary {i} for {name}&lt;/p&gt;</description>"
+        f"<pubDate>{format_datetime(now - timedelta(minutes=10 * i))}</pubDate></item>"
+        for i in range(n)
+    )
+    return (
+        f'<?xml version="1.0"?><rss version="2.0"><channel><title>{name}</title>'
+        f"<link>https://example.com/{name}</link><description>stub</description>{items}</channel></rss>"
+    ).encode()
+
+def newsapi_body(query, page_size=100, page=1, counts=None):
+    """
+    NewsAPI-shaped page for a q of OR'd terms: every term has
+    NEWSAPI_PER_TERM articles (or counts[term]), newest first.
+    """
+    words = [w.strip('"') for w in query.split(" OR ") if w.strip()]
+    counts = counts or {}
+    # each term's articles spread over the last day, so busy terms are denser on every page
+    hits = sorted(
+        (24 * j / n, j, w) for w in words for n in [counts.get(w, NEWSAPI_PER_TERM)] for j in range(n)
+    )
+    start = (page - 1) * page_size
+    now = _this_hour()
+    articles = [
+        {
+            "source": {"id": None, "name": "Stub Wire"},
+            "title": f"{w.title()} headline {j}",
+            "description": f"Story {j} about {w}",
+            "url": f"https://example.com/newsapi/{w.replace(' ', '-')}/{j}",
+            "publishedAt": (now - timedelta(hours=age)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        for age, j, w in hits[start:start + page_size]
+    ]
+    return json.dumps({"status": "ok", "totalResults": len(hits), "articles": articles}).encode()
+
+def _newsapi_error(code, message):
+    return json.dumps({"status": "error", "code": code, "message": message}).encode()
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    failures = {}
+    newsapi_counts = {}  # term -> total results, for busy tickers
+    newsapi_max_results = None  # page * pageSize beyond this is refused, like developer keys
+    lock = threading.Lock()
+    requests_served = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="text/plain", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        with StubHandler.lock:
+            StubHandler.requests_served += 1
+        time.sleep(self.latency)
+
+        parts = urlsplit(self.path)
+        path = parts.path
+        if path.startswith("/flaky/"):
+            _, _, n, rest = path.split("/", 3)
+            with StubHandler.lock:
+                seen = StubHandler.failures.get(self.path, 0)
+                StubHandler.failures[self.path] = seen + 1
+            if seen < int(n):
+                return self._send(503, b"try again")
+            path = "/" + rest
+
+        if path.startswith("/rss/"):
+            body = rss_body(path.split("/")[-1])
+            etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, headers={"ETag": etag})
+            return self._send(200, body, "application/rss+xml", headers={"ETag": etag, "Last-Modified": format_datetime(_this_hour(), usegmt=True)})
+        if path == "/v2/everything":
+            qs = parse_qs(parts.query)
+            q = qs.get("q", [""])[0]
+            page_size = int(qs.get("pageSize", ["100"])[0])
+            page = int(qs.get("page", ["1"])[0])
+            if len(q) > NEWSAPI_MAX_QUERY:
+                return self._send(400, _newsapi_error("parameterInvalid", "q is too long"), "application/json")
+            limit = self.newsapi_max_results
+            if limit is not None and (page - 1) * page_size >= limit:
+                return self._send(426, _newsapi_error("maximumResultsReached", f"limited to {limit} results"), "application/json")
+            return self._send(200, newsapi_body(q, page_size, page, self.newsapi_counts), "application/json")
+        self._send(404, b"not found")
+
+@contextmanager
+def serve(latency=0.0, handler=StubHandler):
+    """Run a stub server on a free local port; yields its base url."""
+    handler.latency = latency
+    handler.requests_served = 0
+    handler.failures = {}
+    handler.newsapi_counts = {}
+    handler.newsapi_max_results = None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == "__main__":
+    with serve() as base:
+        print(f"stub news server on {base} (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
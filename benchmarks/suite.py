@@ -0,0 +1,227 @@
+"""
+Benchmark suite: every stage timed on the same deterministic synthetic
+corpus (benchmarks/synthetic.py), with score_texts running a tiny local
+random BERT (benchmarks/tiny_model.py), so no network or FinBERT download
+is needed. Results are written as JSON with the machine, package versions,
+git commit and a calibration time; --compare checks them against an earlier
+file and exits non-zero when a scenario got slower than --threshold allows.
+
+    python -m benchmarks.suite --size medium
+    python -m benchmarks.suite --size medium --compare benchmarks/results/<baseline>.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import torch
+
+from benchmarks.synthetic import news_rows, scored_rows
+from benchmarks.tiny_model import tiny_bert
+from src.nlp.near_dup import NearDupIndex, cluster_frame
+from src.nlp.sentiment import MAX_BATCH_TOKENS, load_model, score_texts, unique_articles
+from src.scrape.map_tickers import map_frame
+from src.scrape.store import ArticleStore
+from src.signals.engine import compute_multi
+from src.signals.incremental import SignalAggregator
+from src.signals.make_signals import compute_signals
+from src.storage import read_table, typed, write_table
+
+RESULTS_DIR = "benchmarks/results"
+# articles in the corpus, texts scored by the tiny model
+SIZES = {"small": (2_000, 200), "medium": (20_000, 1_000), "large": (200_000, 4_000)}
+THRESHOLD = 0.25  # allowed slowdown before --compare fails
+
+def calibrate(repeat=5):
+    """
+    Fixed Python + numpy workload. Comparing two result files divides their
+    times by this, so a baseline from a faster machine does not read as a
+    regression.
+    """
+    rng = np.random.default_rng(0)
+    values = rng.random(200_000)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        np.sort(values)
+        sum(i * i for i in range(200_000))
+        pd.Series(values).groupby((values * 100).astype(int)).mean()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def scenarios(raw, scored, texts, model_dir, tmp):
+    """name -> (rows processed, setup, fn): fn(setup()) is timed, setup is not."""
+    tokenizer, model = load_model("torch", model_dir)
+    mapped = map_frame(raw)
+    chunk = max(1, len(scored) // 20)
+    stores = iter(range(1_000_000))
+
+    def warm_aggregator():
+        agg = SignalAggregator()
+        agg.update(scored.iloc[:-chunk])
+        return agg
+
+    return {
+        "map_frame": (len(raw), lambda: raw, map_frame),
+        "store_add": (len(raw), lambda: ArticleStore(os.path.join(tmp, f"store{next(stores)}.sqlite")),
+                      lambda store: store.add(raw)),
+        "typed": (len(mapped), lambda: mapped, typed),
+        "cluster_frame": (len(scored), NearDupIndex, lambda index: cluster_frame(scored, index)),
+        "unique_articles": (len(mapped), lambda: mapped,
+                            lambda df: unique_articles(df, (df["title"] + " " + df["text"]).tolist())),
+        "score_texts_fixed": (len(texts), lambda: texts, lambda t: score_texts(t, tokenizer, model)),
+        "score_texts_budget": (len(texts), lambda: texts,
+                               lambda t: score_texts(t, tokenizer, model, max_tokens=MAX_BATCH_TOKENS)),
+        "compute_signals": (len(scored), lambda: scored, compute_signals),
+        "incremental_update": (chunk, warm_aggregator, lambda agg: (agg.update(scored.iloc[-chunk:]), agg.signals())),
+        "compute_multi": (len(scored), lambda: scored, compute_multi),
+        "write_table": (len(scored), lambda: scored, lambda df: write_table(df, "bench_scored", export_csv=False)),
+        "read_table": (len(scored), lambda: write_table(scored, "bench_scored", export_csv=False),
+                       lambda _: read_table("bench_scored")),
+    }
+
+def run(cases, repeat):
+    results = {}
+    for name, (rows, setup, fn) in cases.items():
+        times = []
+        for _ in range(repeat):
+            arg = setup()
+            start = time.perf_counter()
+            fn(arg)
+            times.append(time.perf_counter() - start)
+        median = statistics.median(times)
+        results[name] = {
+            "rows": rows,
+            "repeat": repeat,
+            "min_s": round(min(times), 5),
+            "median_s": round(median, 5),
+            "rows_per_s": round(rows / median, 1) if median > 0 else None,
+        }
+        print(f"{name:<20} {rows:>8} {min(times) * 1000:>10.1f} {median * 1000:>10.1f} {results[name]['rows_per_s']:>12.0f}")
+    return results
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def machine():
+    import pyarrow
+    import transformers
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "torch_threads": torch.get_num_threads(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "pyarrow": pyarrow.__version__,
+        "torch": torch.__version__,
+        "transformers": transformers.__version__,
+    }
+
+def compare(new, old, threshold=THRESHOLD):
+    """
+    Per-scenario slowdown of new vs old (median times, scaled by the two
+    calibration times). Returns the names slower than 1 + threshold.
+    """
+    if new["params"] != old["params"]:
+        raise SystemExit(f"Results are not comparable: params {new['params']} vs {old['params']}")
+
+    scale = new["calibration_s"] / old["calibration_s"]
+    print(f"\nvs {old['git']} ({old['created']}), machine speed ratio {scale:.2f}")
+    print(f"{'scenario':<20} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    slower = []
+    for name, res in new["results"].items():
+        if name not in old["results"]:
+            continue
+        before = old["results"][name]["median_s"]
+        ratio = res["median_s"] / (before * scale)
+        flag = ""
+        if ratio > 1 + threshold:
+            slower.append(name)
+            flag = "  SLOWER"
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<20} {before * 1000:>10.1f} {res['median_s'] * 1000:>10.1f} {ratio:>7.2f}{flag}")
+    return slower
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", choices=SIZES, default="medium")
+    ap.add_argument("--mentions", type=float, default=1.0, help="mean ticker mentions per article")
+    ap.add_argument("--long-frac", type=float, default=0.3, help="share of articles with a long body")
+    ap.add_argument("--spread-hours", type=int, default=120)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--threads", type=int, default=1, help="torch threads; fixed so runs compare")
+    ap.add_argument("--only", default="", help="comma separated scenario names")
+    ap.add_argument("--out", default=None, help="result file (default benchmarks/results/<commit>-<size>.json)")
+    ap.add_argument("--compare", default=None, help="earlier result file to check against")
+    ap.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = ap.parse_args()
+
+    torch.set_num_threads(args.threads)
+    n, n_texts = SIZES[args.size]
+    params = {"size": args.size, "articles": n, "texts": n_texts, "mentions": args.mentions,
+              "long_frac": args.long_frac, "spread_hours": args.spread_hours, "seed": args.seed}
+
+    raw = news_rows(n, mentions=args.mentions, long_frac=args.long_frac, spread_hours=args.spread_hours, seed=args.seed)
+    scored = scored_rows(typed(map_frame(raw)), seed=args.seed)
+    texts = (raw["title"] + " " + raw["summary"].fillna("")).head(n_texts).tolist()
+    print(f"corpus: {len(raw)} articles -> {len(scored)} mapped rows, {len(texts)} texts to score")
+
+    out = os.path.abspath(args.out or os.path.join(RESULTS_DIR, f"{git_commit() or 'nogit'}-{args.size}.json"))
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = scenarios(raw, scored, texts, tiny_bert(), tmp)
+        if args.only:
+            names = [s.strip() for s in args.only.split(",") if s.strip()]
+            unknown = set(names) - set(cases)
+            if unknown:
+                raise SystemExit(f"Unknown scenarios {sorted(unknown)}, expected some of {list(cases)}")
+            cases = {k: cases[k] for k in names}
+
+        # write_table / read_table work under data/processed of the cwd
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            print(f"{'scenario':<20} {'rows':>8} {'min ms':>10} {'median ms':>10} {'rows/s':>12}")
+            results = run(cases, args.repeat)
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "git": git_commit(),
+        "machine": machine(),
+        "calibration_s": round(calibrate(), 5),
+        "params": params,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {out}")
+
+    if baseline is not None:
+        slower = compare(report, baseline, args.threshold)
+        if slower:
+            raise SystemExit(f"Slower than {args.compare} by more than {args.threshold:.0%}: {', '.join(slower)}")
+
+if __name__ == "__main__":
+    main()
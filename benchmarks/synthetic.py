@@ -0,0 +1,104 @@
+"""
+Deterministic synthetic news for benchmarks: the same arguments always give
+the same rows, so timings from different commits are comparable.
+
+    raw = news_rows(10_000, mentions=1.5, long_frac=0.3, spread_hours=120)
+    scored = scored_rows(map_frame(raw))
+"""
+import numpy as np
+import pandas as pd
+
+from src.config import ALIASES, WATCHLIST
+
+FILLER = (
+    "shares stock market earnings beat miss guidance rise fall analysts said the company "
+    "quarter revenue outlook investors rally slump record rates inflation demand supply "
+    "chips cloud deliveries margin forecast upgrade downgrade buyback dividend lawsuit"
+).split()
+SOURCES = ["YahooFinance", "MarketWatch", "Reuters", "Bloomberg"]
+START = pd.Timestamp("2024-06-01", tz="UTC")
+
+def mention_names(watchlist=WATCHLIST, aliases=ALIASES):
+    """Every surface form the matcher knows: tickers, $tickers and aliases."""
+    return [a for t in watchlist for a in [t, f"${t}"] + aliases.get(t, [])]
+
+def news_rows(n, mentions=1.0, short_words=12, long_words=150, long_frac=0.3,
+              spread_hours=120, missing_summary=0.2, missing_published=0.05,
+              duplicate_frac=0.0, dup_edits=2, markup_frac=0.0, seed=0, start=START):
+    """
+    Raw article rows shaped like the ArticleStore's, plus a story column.
+
+    mentions: mean watchlist mentions per article (Poisson), so 0 gives
+    articles no ticker matches. Titles are ~short_words long; a long_frac
+    share of articles carries a ~long_words body, like NewsAPI content.
+    published_utc is spread uniformly over spread_hours before start.
+    duplicate_frac of rows are syndicated copies of an earlier article:
+    same body, dup_edits title words replaced, a new url and source, and
+    published up to two hours after it. story is the row of the original.
+    markup_frac of summaries arrive as feed HTML: the title again in bold,
+    the body in <p> and a WordPress "The post ... appeared first on" line.
+    """
+    rng = np.random.default_rng(seed)
+    names = np.array(mention_names())
+    filler = np.array(FILLER)
+
+    title_len = np.maximum(3, rng.poisson(short_words, n))
+    body_len = np.where(rng.random(n) < long_frac, np.maximum(20, rng.poisson(long_words, n)), rng.poisson(short_words * 2, n))
+    n_mentions = rng.poisson(mentions, n)
+
+    titles, summaries = [], []
+    for i in range(n):
+        words = list(filler[rng.integers(0, len(filler), title_len[i])])
+        for name in names[rng.integers(0, len(names), n_mentions[i])]:
+            words.insert(int(rng.integers(0, len(words) + 1)), name)
+        titles.append(words)
+        summaries.append(" ".join(filler[rng.integers(0, len(filler), body_len[i])]))
+    no_summary = rng.random(n) < missing_summary
+    age = rng.integers(0, spread_hours * 3600, n)
+
+    story = np.arange(n)
+    dup = np.flatnonzero(rng.random(n) < duplicate_frac)
+    dup = dup[dup > 0]
+    for i, j in zip(dup, rng.integers(0, np.maximum(dup, 1))):
+        words = list(titles[j])
+        for k in rng.integers(0, len(words), dup_edits):
+            words[k] = filler[rng.integers(0, len(filler))]
+        titles[i], summaries[i], no_summary[i] = words, summaries[j], no_summary[j]
+        age[i] = max(0, age[j] - int(rng.integers(0, 7200)))
+        story[i] = story[j]
+
+    title = pd.Series([" ".join(w) for w in titles], dtype=object)
+    title = title.str[:1].str.upper() + title.str[1:]
+    summary = pd.Series(summaries, dtype=object)
+    summary[no_summary] = None
+    published = start - pd.to_timedelta(age, unit="s")
+    published = pd.Series(published.map(pd.Timestamp.isoformat), dtype=object)
+    published[rng.random(n) < missing_published] = None
+
+    source = np.array(SOURCES)[rng.integers(0, len(SOURCES), n)]
+    if markup_frac:
+        html = np.flatnonzero((rng.random(n) < markup_frac) & summary.notna().to_numpy())
+        summary[html] = [
+            f'<p><strong>{title[i]}</strong></p><p>{summary[i]}</p><p>The post <a href="https://example.com/story/{i}">'
+            f"{title[i]}</a> appeared first on {source[i]}.</p>"
+            for i in html
+        ]
+
+    return pd.DataFrame({
+        "timestamp_utc": start.isoformat(),
+        "source": source,
+        "published_utc": published,
+        "title": title,
+        "summary": summary,
+        "text": (title + " " + summary.fillna("")).str.strip(),
+        "url": [f"https://example.com/story/{i}" for i in range(n)],
+        "story": story,
+    })
+
+def scored_rows(mapped, seed=0):
+    """Mapped rows with deterministic sentiment columns, as the scorer would add."""
+    rng = np.random.default_rng(seed)
+    return mapped.assign(
+        sentiment_score=np.round(rng.uniform(-1, 1, len(mapped)), 3),
+        sentiment_confidence=np.round(rng.uniform(0.34, 1, len(mapped)), 3),
+    )
@@ -0,0 +1,54 @@
+"""
+A tiny random-weight BERT classifier (3 labels, like FinBERT) saved as a
+local model directory, so score_texts can be benchmarked without downloads.
+Scores are meaningless; shapes, tokenization and the batching code path are
+the real ones.
+
+    python -m benchmarks.tiny_model  # prints the directory; use as FINBERT_PATH
+"""
+import os
+import string
+import tempfile
+
+import torch
+from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+from benchmarks.synthetic import FILLER, mention_names
+
+TINY_DIR = os.path.join(tempfile.gettempdir(), "mpa-tiny-bert")
+SPECIAL = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+
+def _vocab():
+    words = {w.lower() for name in mention_names() for w in name.replace("$", "").split()}
+    words |= set(FILLER)
+    chars = string.ascii_lowercase + string.digits
+    pieces = list(chars) + list(string.punctuation) + [f"##{c}" for c in chars]
+    return SPECIAL + pieces + sorted(words - set(pieces))
+
+def tiny_bert(path=TINY_DIR, hidden=32, layers=2, seed=0):
+    """Build (once) and return the directory of a tiny BERT + tokenizer."""
+    if os.path.exists(os.path.join(path, "config.json")):
+        return path
+    os.makedirs(path, exist_ok=True)
+
+    vocab_file = os.path.join(path, "vocab.txt")
+    with open(vocab_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(_vocab()) + "\n")
+    tokenizer = BertTokenizerFast(vocab_file=vocab_file, do_lower_case=True)
+
+    torch.manual_seed(seed)
+    config = BertConfig(
+        vocab_size=tokenizer.vocab_size,
+        hidden_size=hidden,
+        num_hidden_layers=layers,
+        num_attention_heads=2,
+        intermediate_size=hidden * 2,
+        max_position_embeddings=512,
+        num_labels=3,
+    )
+    BertForSequenceClassification(config).save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return path
+
+if __name__ == "__main__":
+    print(tiny_bert())
@@ -1,7 +1,17 @@
+import sys
+import time
+from pathlib import Path
+
 import pandas as pd
 import streamlit as st
 import plotly.express as px
 
+# streamlit runs this file as a script; make the repo's src package importable
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from dashboard.render import history_table_html, page, page_count, signals_table_html
+from dashboard.views import build_views
+from src.storage import read_table, table_mtime
+
 st.set_page_config(page_title="Market Pulse AI", layout="wide")
 
 st.markdown(
@@ -47,8 +57,19 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-df = pd.read_csv("data/processed/signals_latest.csv")
-df["hour"] = pd.to_datetime(df["hour"], utc=True)
+SIGNALS = "signals_latest"
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_views(mtime):
+    # keyed on the file's mtime: a new pipeline write is a cache miss, every
+    # widget interaction in between reuses the same precomputed views
+    return build_views(read_table(SIGNALS))
+
+mtime = table_mtime(SIGNALS)
+if mtime is None:
+    st.error("No signals yet. Run: make run")
+    st.stop()
+views = load_views(mtime)
 
 st.title("Market Pulse AI")
 st.caption("News sentiment driven market signals")
@@ -56,129 +77,30 @@ st.caption("News sentiment driven market signals")
 tab_overview, tab_ticker = st.tabs(["Overview", "Ticker Detail"])
 #st.caption("RSS headlines -> ticker mapping -> FinBERT sentiment -> hourly signals")
 
-def history_table_with_links(df_hist):
-    rows_html = []
-
-    for _, r in df_hist.iterrows():
-        title = (r.get("rep_title") or "").replace('"', "&quot;")
-        url = r.get("rep_url") or ""
-        link = f'<a href="{url}" target="_blank" rel="noopener noreferrer">{title}</a>' if url else title
-
-        delta = r.get("sentiment_delta")
-        delta_str = "" if pd.isna(delta) else f"{delta:.3f}"
-
-        rows_html.append(
-            f"<tr>"
-            f"<td class='col-time'>{r.get('time_local','')}</td>"
-            f"<td class='col-avg'>{float(r.get('avg_sentiment', 0)):.3f}</td>"
-            f"<td class='col-delta'>{delta_str}</td>"
-            f"<td class='col-signal'><b>{r.get('signal','')}</b></td>"
-            f"<td class='col-headline'>{link}</td>"
-            f"</tr>"
-        )
-
-    html = (
-        "<div style='overflow-x:auto;'>"
-        "<table class='mpa-table'>"
-        "<thead>"
-        "<tr>"
-        "<th class='col-time'>Time</th>"
-        "<th class='col-avg'>Average Sentiment</th>"
-        "<th class='col-delta'>Sentiment Delta</th>"
-        "<th class='col-signal'>Signal</th>"
-        "<th class='col-headline'>Headline</th>"
-        "</tr>"
-        "</thead>"
-        "<tbody>"
-        + "".join(rows_html) +
-        "</tbody>"
-        "</table>"
-        "</div>"
-    )
-
-    st.markdown(html, unsafe_allow_html=True)
-
-def latest_signals_table(df_latest):
-    rows_html = []
-
-    for _, r in df_latest.iterrows():
-        sig = r.get("signal", "HOLD")
-        sig_class = "sig-hold"
-        if sig == "BUY":
-            sig_class = "sig-buy"
-        elif sig == "SELL":
-            sig_class = "sig-sell"
-
-        delta = r.get("sentiment_delta")
-        delta_str = "" if pd.isna(delta) else f"{delta:.3f}"
-
-        rows_html.append(
-            f"<tr>"
-            f"<td class='col-ticker'><b>{r.get('ticker','')}</b></td>"
-            f"<td class='col-avg'>{float(r.get('avg_sentiment', 0)):.3f}</td>"
-            f"<td class='col-vol'>{int(r.get('articles_window', 0))}</td>"
-            f"<td class='col-delta'>{delta_str}</td>"
-            f"<td class='col-signal'><span class='{sig_class}'>{sig}</span></td>"
-            f"<td class='col-conf'>{float(r.get('confidence', 0)):.2f}</td>"
-            f"</tr>"
-        )
-
-    html = (
-        "<div style='overflow-x:auto;'>"
-        "<table class='mpa-table'>"
-        "<thead>"
-        "<tr>"
-        "<th class='col-ticker' style='text-align:left;'>Ticker</th>"
-        "<th class='col-avg' style='text-align:right;'>Average Sentiment</th>"
-        "<th class='col-vol' style='text-align:right;'>Articles</th>"
-        "<th class='col-delta' style='text-align:right;'>Sentiment Delta</th>"
-        "<th class='col-signal' style='text-align:center;'>Signal</th>"
-        "<th class='col-conf' style='text-align:right;'>Confidence</th>"
-        "</tr>"
-        "</thead>"
-        "<tbody>"
-        + "".join(rows_html) +
-        "</tbody>"
-        "</table>"
-        "</div>"
-    )
-
-    st.markdown(html, unsafe_allow_html=True)
+def render_table(build, rows, note=""):
+    # build + send time, shown under each table so slow views are visible
+    start = time.perf_counter()
+    st.markdown(build(rows), unsafe_allow_html=True)
+    st.caption(f"{len(rows)} rows{note} rendered in {(time.perf_counter() - start) * 1000:.1f} ms")
 
 with tab_overview:
-    latest_by_ticker = (
-        df.sort_values("hour")
-          .groupby("ticker", as_index=False)
-          .tail(1)
-          .sort_values("avg_sentiment", ascending=False)
-    )
-    # total articles across the whole window for each ticker
-    window_articles = df.groupby("ticker")["volume"].sum().rename("articles_window").reset_index()
-    latest_by_ticker = latest_by_ticker.merge(window_articles, on="ticker", how="left")
-
     st.subheader("Latest Signals")
-    latest_signals_table(
-        latest_by_ticker[["ticker", "avg_sentiment", "volume", "articles_window", "sentiment_delta", "signal", "confidence"]]
-    )
+    overview = views["overview"]
+    pages = page_count(len(overview))
+    number = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) if pages > 1 else 1
+    render_table(signals_table_html, page(overview, number), f" of {len(overview)}")
 with tab_ticker:
-    tickers = sorted(df["ticker"].unique())
-    ticker = st.selectbox("Select ticker", tickers)
-
-    sub = df[df["ticker"] == ticker].sort_values("hour").copy()
-    # convert UTC hour to local readable time
-    sub["time_local"] = (
-        sub["hour"]
-        .dt.tz_convert("America/Indiana/Indianapolis")
-        .dt.strftime("%b %d, %I %p")
-    )
-    latest = sub.iloc[-1]
+    ticker = st.selectbox("Select ticker", list(views["tickers"]))
+
+    view = views["tickers"][ticker]
+    latest = view["latest"]
 
     c1, c2, c3, c4, c5 = st.columns(5)
 
     c1.metric("Avg Sentiment", f"{latest['avg_sentiment']:.3f}")
 
-    articles_window = int(sub["volume"].sum())
-    hours_tracked = int(sub["hour"].nunique())
+    articles_window = view["articles_window"]
+    hours_tracked = view["hours_tracked"]
 
     WINDOW_HOURS = 120
     c2.metric(f"Articles (last {WINDOW_HOURS//24} days)", articles_window, help="Total number of articles used to compute sentiment in this time window")
@@ -211,8 +133,9 @@ with tab_ticker:
         unsafe_allow_html=True
     )
 
+    chart_start = time.perf_counter()
     fig = px.line(
-        sub,
+        view["chart"],
         x="hour",
         y="avg_sentiment",
         template="plotly_dark",
@@ -221,11 +144,11 @@ with tab_ticker:
     fig.update_traces(line=dict(width=3))
 
     st.plotly_chart(fig, width="stretch")
+    st.caption(f"{len(view['chart'])} of {len(view['rows'])} points plotted in {(time.perf_counter() - chart_start) * 1000:.1f} ms")
 
 
-    history = sub.sort_values("hour", ascending=False).head(30).copy()
     st.subheader("Recent History")
-    history_table_with_links(history)
+    render_table(history_table_html, view["history"])
     # st.dataframe(
     #     history[
     #         ["time_local", "avg_sentiment", "sentiment_delta", "rep_title", "signal", "confidence"]
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+PAGE_SIZE = 50  # table rows rendered per page
+CHART_POINTS = 500  # points per line chart after downsampling
+
+SIGNAL_CLASSES = {"BUY": "sig-buy", "SELL": "sig-sell"}
+
+SIGNALS_HEADER = (
+    "<th class='col-ticker' style='text-align:left;'>Ticker</th>"
+    "<th class='col-avg' style='text-align:right;'>Average Sentiment</th>"
+    "<th class='col-vol' style='text-align:right;'>Articles</th>"
+    "<th class='col-delta' style='text-align:right;'>Sentiment Delta</th>"
+    "<th class='col-signal' style='text-align:center;'>Signal</th>"
+    "<th class='col-conf' style='text-align:right;'>Confidence</th>"
+)
+
+HISTORY_HEADER = (
+    "<th class='col-time'>Time</th>"
+    "<th class='col-avg'>Average Sentiment</th>"
+    "<th class='col-delta'>Sentiment Delta</th>"
+    "<th class='col-signal'>Signal</th>"
+    "<th class='col-headline'>Headline</th>"
+)
+
+def _fmt(col, spec):
+    """Format a numeric column as strings; NaN -> ''."""
+    values = col.to_numpy(dtype=float)
+    out = pd.Series([format(v, spec) for v in values.tolist()], index=col.index, dtype=object)
+    return out.where(~np.isnan(values), "")
+
+def _text(col):
+    return col.astype(object).where(col.notna(), "").astype(str)
+
+def _table(header, cells):
+    return (
+        "<div style='overflow-x:auto;'>"
+        "<table class='mpa-table'>"
+        "<thead>"
+        "<tr>"
+        + header +
+        "</tr>"
+        "</thead>"
+        "<tbody>"
+        + "".join(cells.tolist()) +
+        "</tbody>"
+        "</table>"
+        "</div>"
+    )
+
+def signals_table_html(df):
+    """Latest-signals table; every column is formatted in one go, no per-row loop."""
+    if df.empty:
+        return _table(SIGNALS_HEADER, pd.Series([], dtype=object))
+    sig = _text(df["signal"])
+    rows = (
+        "<tr>"
+        "<td class='col-ticker'><b>" + _text(df["ticker"]) + "</b></td>"
+        "<td class='col-avg'>" + _fmt(df["avg_sentiment"].fillna(0), ".3f") + "</td>"
+        "<td class='col-vol'>" + df["articles_window"].fillna(0).astype(int).astype(str) + "</td>"
+        "<td class='col-delta'>" + _fmt(df["sentiment_delta"], ".3f") + "</td>"
+        "<td class='col-signal'><span class='" + sig.map(SIGNAL_CLASSES).fillna("sig-hold") + "'>" + sig + "</span></td>"
+        "<td class='col-conf'>" + _fmt(df["confidence"].fillna(0), ".2f") + "</td>"
+        "</tr>"
+    )
+    return _table(SIGNALS_HEADER, rows)
+
+def history_table_html(df):
+    """Recent-history table with headline links, built column-wise."""
+    if df.empty:
+        return _table(HISTORY_HEADER, pd.Series([], dtype=object))
+    title = _text(df["rep_title"]).str.replace('"', "&quot;", regex=False)
+    url = _text(df["rep_url"])
+    link = ('<a href="' + url + '" target="_blank" rel="noopener noreferrer">' + title + "</a>").where(url != "", title)
+    rows = (
+        "<tr>"
+        "<td class='col-time'>" + _text(df["time_local"]) + "</td>"
+        "<td class='col-avg'>" + _fmt(df["avg_sentiment"].fillna(0), ".3f") + "</td>"
+        "<td class='col-delta'>" + _fmt(df["sentiment_delta"], ".3f") + "</td>"
+        "<td class='col-signal'><b>" + _text(df["signal"]) + "</b></td>"
+        "<td class='col-headline'>" + link + "</td>"
+        "</tr>"
+    )
+    return _table(HISTORY_HEADER, rows)
+
+def page(df, number, size=PAGE_SIZE):
+    """Rows of 1-based page number."""
+    return df.iloc[(number - 1) * size:number * size]
+
+def page_count(n, size=PAGE_SIZE):
+    return max(1, -(-n // size))
+
+def lttb(x, y, n=CHART_POINTS):
+    """
+    Largest-Triangle-Three-Buckets downsampling: indices of at most n points
+    that keep the visual shape of the (x, y) line. First and last points are
+    always kept; x must be increasing.
+    """
+    size = len(y)
+    if n >= size or n < 3:
+        return np.arange(size)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # n - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, size - 1, n - 1).astype(int)
+    out = np.empty(n, dtype=int)
+    out[0], out[-1] = 0, size - 1
+
+    prev = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # the next bucket's average is the third corner of the triangle
+        nlo, nhi = hi, edges[i + 2] if i + 2 < n - 1 else size
+        ax, ay = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        px, py = x[prev], y[prev]
+        area = np.abs((px - ax) * (y[lo:hi] - py) - (px - x[lo:hi]) * (ay - py))
+        prev = lo + int(np.argmax(area))
+        out[i + 1] = prev
+    return out
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from dashboard.render import lttb
+
+LOCAL_TZ = "America/Indiana/Indianapolis"
+HISTORY_ROWS = 30
+
+OVERVIEW_COLUMNS = ["ticker", "avg_sentiment", "volume", "articles_window", "sentiment_delta", "signal", "confidence"]
+
+def build_views(df):
+    """
+    Everything the dashboard shows, computed once per signals file:
+    the overview table, the ticker list, and for each ticker its hourly
+    rows (with local-time labels), latest row, window totals, recent
+    history and downsampled chart series. Widget interactions then only look things up.
+    """
+    df = df.sort_values(["ticker", "hour"], kind="stable")
+    # every ticker shares the same hours, so format each distinct hour once
+    codes, hours = pd.factorize(df["hour"])
+    df["time_local"] = hours.tz_convert(LOCAL_TZ).strftime("%b %d, %I %p").to_numpy()[codes]
+
+    tickers = {}
+    for ticker, sub in df.groupby("ticker", observed=True, sort=True):
+        sub = sub.reset_index(drop=True)
+        tickers[str(ticker)] = {
+            "rows": sub,
+            "latest": sub.iloc[-1],
+            "articles_window": int(sub["volume"].sum()),
+            "hours_tracked": int(sub["hour"].nunique()),
+            "history": sub.iloc[::-1].head(HISTORY_ROWS),
+            # long series are downsampled once here, not on every chart draw
+            "chart": sub.iloc[lttb(sub["hour"].array.asi8, sub["avg_sentiment"].to_numpy())],
+        }
+
+    overview = pd.DataFrame([
+        {**v["latest"].to_dict(), "articles_window": v["articles_window"]} for v in tickers.values()
+    ], columns=list(df.columns) + ["articles_window"])
+    overview = overview.sort_values("avg_sentiment", ascending=False, kind="stable")[OVERVIEW_COLUMNS]
+
+    return {"overview": overview, "tickers": tickers}
@@ -2,6 +2,22 @@ WATCHLIST = ["AAPL", "TSLA", "NVDA", "MSFT", "AMZN", "GOOGL", "META", "NFLX", "L
 
 WINDOW_HOURS = 120  # last 5 days
 
+STORAGE_FORMAT = "parquet"  # or "csv"
+EXPORT_CSV = False  # also write a .csv copy of every parquet stage output
+
+# signal volume counts near-duplicate clusters (one per syndicated story)
+# instead of every copy of it
+COUNT_CLUSTERS = False
+
+# score with the finance lexicon first and send only texts it is less
+# confident about than this to FinBERT (e.g. 0.7); None: FinBERT for all
+SENTIMENT_CASCADE = None
+
+# python -m src.signals.engine: bucket sizes (pandas offsets, each a multiple
+# of the smallest) and what each bucket is compared against
+SIGNAL_RESOLUTIONS = ["15min", "h", "D"]
+SIGNAL_BASELINES = ["diff", "rolling:6", "ewm:12"]
+
 RSS_FEEDS = {
     "YahooFinance": "https://finance.yahoo.com/news/rssindex",
     "MarketWatch": "https://feeds.marketwatch.com/marketwatch/topstories/",
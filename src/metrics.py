@@ -0,0 +1,167 @@
+import argparse
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+METRICS_PATH = "data/processed/metrics.jsonl"
+PROFILE_DIR = "data/processed/profiles"
+
+# PROFILE=all (or a comma separated list of stage names) runs those stages
+# under cProfile and dumps data/processed/profiles/<run>-<stage>.prof
+PROFILE = os.getenv("PROFILE", "")
+# `make profile` sets one RUN_ID for all of its steps so they summarise together
+RUN_ID = os.getenv("RUN_ID") or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+def _profiled(name):
+    names = {n.strip() for n in PROFILE.split(",") if n.strip()}
+    return "all" in names or name in names
+
+@contextmanager
+def stage(name, rows_in=None):
+    """
+    Time a pipeline stage and append one record to METRICS_PATH:
+
+        with stage("map", rows_in=len(new)) as rec:
+            out = map_frame(new)
+            rec["rows_out"] = len(out)
+
+    Sub-steps timed with step() inside the block are summed into rec["steps"].
+    """
+    rec = {"run": RUN_ID, "stage": name, "pid": os.getpid(), "rows_in": rows_in, "rows_out": None, "steps": {}}
+    stack = _stack()
+    stack.append(rec)
+
+    # one cProfile at a time per thread: nested stages share the outer profile
+    profiler = None
+    if _profiled(name) and not any(r.get("profile") for r in stack[:-1]):
+        profiler = cProfile.Profile()
+        rec["profile"] = os.path.join(PROFILE_DIR, f"{RUN_ID}-{name}.prof")
+
+    rec["started"] = datetime.now(timezone.utc).isoformat()
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield rec
+    finally:
+        if profiler:
+            profiler.disable()
+        wall = time.perf_counter() - start
+        stack.pop()
+
+        rows = rec["rows_out"] if rec["rows_out"] is not None else rec["rows_in"]
+        rec["wall_s"] = round(wall, 4)
+        rec["rows_per_s"] = round(rows / wall, 1) if rows and wall > 0 else None
+        rec["peak_rss_mb"] = peak_rss_mb()
+        rec["steps"] = {k: round(v, 4) for k, v in rec["steps"].items()}
+
+        if profiler:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profiler.dump_stats(rec["profile"])
+        _write(rec)
+
+@contextmanager
+def step(name):
+    """Add the block's wall time to the innermost active stage; no-op outside one."""
+    stack = _stack()
+    if not stack:
+        yield
+        return
+    steps = stack[-1]["steps"]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        steps[name] = steps.get(name, 0.0) + time.perf_counter() - start
+
+def record(**fields):
+    """Set fields (e.g. rows_in) on the innermost active stage; no-op outside one."""
+    stack = _stack()
+    if stack:
+        stack[-1].update(fields)
+
+def _write(rec):
+    os.makedirs(os.path.dirname(METRICS_PATH), exist_ok=True)
+    line = json.dumps(rec, default=str)
+    with _write_lock, open(METRICS_PATH, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+def load_metrics(path=METRICS_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def summary(records):
+    """One line per stage: calls, total wall time, rows, throughput, peak RSS, slowest steps."""
+    by_stage = {}
+    for r in records:
+        s = by_stage.setdefault(r["stage"], {"calls": 0, "wall": 0.0, "rows_in": 0, "rows_out": 0, "rss": 0.0, "steps": {}})
+        s["calls"] += 1
+        s["wall"] += r["wall_s"]
+        s["rows_in"] += r["rows_in"] or 0
+        s["rows_out"] += r["rows_out"] or 0
+        s["rss"] = max(s["rss"], r["peak_rss_mb"] or 0)
+        for k, v in r["steps"].items():
+            s["steps"][k] = s["steps"].get(k, 0.0) + v
+
+    lines = [f"{'stage':<18} {'calls':>5} {'wall s':>8} {'rows in':>9} {'rows out':>9} {'rows/s':>9} {'RSS MB':>8}  steps (s)"]
+    for name, s in by_stage.items():
+        rows = s["rows_out"] or s["rows_in"]
+        rate = f"{rows / s['wall']:.0f}" if rows and s["wall"] else ""
+        steps = ", ".join(f"{k} {v:.2f}" for k, v in sorted(s["steps"].items(), key=lambda kv: -kv[1]))
+        lines.append(
+            f"{name:<18} {s['calls']:>5} {s['wall']:>8.2f} {s['rows_in']:>9} {s['rows_out']:>9} {rate:>9} {s['rss']:>8.0f}  {steps}"
+        )
+    return "\n".join(lines)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--run", default="latest", help="run id to summarise, 'latest' or 'all'")
+    ap.add_argument("--path", default=METRICS_PATH)
+    args = ap.parse_args()
+
+    records = load_metrics(args.path)
+    if not records:
+        raise SystemExit(f"No metrics in {args.path}. Run the pipeline (or make profile) first.")
+
+    run = records[-1]["run"] if args.run == "latest" else args.run
+    if run != "all":
+        records = [r for r in records if r["run"] == run]
+    print(f"run {run}: {len(records)} stage records from {args.path}")
+    print(summary(records))
+
+    profiles = [r["profile"] for r in records if r.get("profile")]
+    if profiles:
+        print("cProfile dumps (python -m pstats <file>, or snakeviz):")
+        for p in profiles:
+            print(f"  {p}")
+
+if __name__ == "__main__":
+    main()
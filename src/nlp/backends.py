@@ -0,0 +1,85 @@
+import hashlib
+import inspect
+import os
+from types import SimpleNamespace
+
+import torch
+
+BACKENDS = ("torch", "int8", "onnx")
+ONNX_DIR = "data/models"
+
+def quantize_int8(model):
+    """Dynamic int8 quantization of the Linear layers; activations stay fp32."""
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def export_onnx(model, tokenizer, path):
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    # the exporter lays graph inputs out in forward() order, whatever the
+    # tokenizer's key order; name them in that order too, or ONNX Runtime
+    # gets attention_mask and token_type_ids swapped when feeding by name
+    params = list(inspect.signature(model.forward).parameters)
+    names = sorted(sample.keys(), key=params.index)
+    axes = {n: {0: "batch", 1: "seq"} for n in names}
+    axes["logits"] = {0: "batch"}
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # write aside and rename, so a reader never opens a partial file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    torch.onnx.export(
+        model,
+        (dict(sample),),
+        tmp,
+        input_names=names,
+        output_names=["logits"],
+        dynamic_axes=axes,
+        opset_version=17,
+        dynamo=False,
+    )
+    os.replace(tmp, path)
+
+class OnnxModel:
+    """
+    ONNX Runtime session that can stand in for the torch model in score_texts:
+    called with the tokenizer's tensors, returns an object with .logits.
+    """
+
+    def __init__(self, path, threads=None):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise SystemExit("ONNX backend needs onnxruntime. Run: pip install onnxruntime")
+
+        opts = ort.SessionOptions()
+        if threads:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+        self.inputs = [i.name for i in self.session.get_inputs()]
+
+    def __call__(self, **enc):
+        feed = {k: v.cpu().numpy() for k, v in enc.items() if k in self.inputs}
+        logits = self.session.run(["logits"], feed)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+    def eval(self):
+        return self
+
+def model_fingerprint(model_path):
+    """
+    Short hash of a checkpoint: its resolved path plus the size and mtime of
+    each file in it, so a fine-tuned or re-downloaded model gets a new one.
+    A hub name with no local directory hashes as the name alone.
+    """
+    parts = [model_path]
+    if os.path.isdir(model_path):
+        root = os.path.realpath(model_path)
+        parts = [root]
+        for name in sorted(os.listdir(root)):
+            st = os.stat(os.path.join(root, name))
+            if not os.path.isdir(os.path.join(root, name)):
+                parts.append(f"{name}:{st.st_size}:{st.st_mtime_ns}")
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()[:12]
+
+def onnx_path(model_path):
+    """Export location, keyed on the checkpoint so a changed model is re-exported."""
+    name = os.path.basename(os.path.normpath(model_path))
+    return os.path.join(ONNX_DIR, f"{name}-{model_fingerprint(model_path)}.onnx")
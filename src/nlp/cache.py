@@ -0,0 +1,104 @@
+import hashlib
+import os
+import re
+import sqlite3
+import time
+
+from src.config import WINDOW_HOURS
+
+CACHE_PATH = "data/processed/sentiment_cache.sqlite"
+
+_WS = re.compile(r"\s+")
+
+def text_key(text):
+    """
+    Hash of the text as the model sees it: whitespace is collapsed so that
+    re-scraped rows with different spacing still hit the cache.
+    """
+    norm = _WS.sub(" ", text or "").strip()
+    return hashlib.sha1(norm.encode("utf-8")).hexdigest()
+
+class SentimentCache:
+    """
+    Persistent (model id, max_length, text hash) -> (score, confidence) store.
+
+    Entries are touched whenever they are read, so anything still inside the
+    scrape window stays warm and anything that fell out of it is evicted.
+    """
+
+    def __init__(self, path=CACHE_PATH, model_id="", max_length=256):
+        self.path = path
+        self.model_id = model_id
+        self.max_length = max_length
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sentiment (
+                model_id TEXT NOT NULL,
+                max_length INTEGER NOT NULL,
+                text_hash TEXT NOT NULL,
+                score REAL NOT NULL,
+                confidence REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model_id, max_length, text_hash)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def get_many(self, keys):
+        """Return {text_hash: (score, confidence)} for the keys already cached."""
+        found = {}
+        uniq = list(dict.fromkeys(keys))
+
+        # stay under sqlite's bound-parameter limit
+        for i in range(0, len(uniq), 500):
+            chunk = uniq[i:i+500]
+            marks = ",".join("?" * len(chunk))
+            cur = self.conn.execute(
+                f"SELECT text_hash, score, confidence FROM sentiment "
+                f"WHERE model_id = ? AND max_length = ? AND text_hash IN ({marks})",
+                [self.model_id, self.max_length, *chunk],
+            )
+            for h, s, c in cur:
+                found[h] = (s, c)
+
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE sentiment SET last_used = ? WHERE model_id = ? AND max_length = ? AND text_hash = ?",
+                [(now, self.model_id, self.max_length, h) for h in found],
+            )
+            self.conn.commit()
+
+        self.hits += sum(1 for k in keys if k in found)
+        self.misses += sum(1 for k in keys if k not in found)
+        return found
+
+    def put_many(self, items):
+        """items: iterable of (text_hash, score, confidence)."""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO sentiment VALUES (?, ?, ?, ?, ?, ?)",
+            [(self.model_id, self.max_length, h, float(s), float(c), now) for h, s, c in items],
+        )
+        self.conn.commit()
+
+    def evict(self, max_age_hours=WINDOW_HOURS):
+        cutoff = time.time() - max_age_hours * 3600
+        cur = self.conn.execute("DELETE FROM sentiment WHERE last_used < ?", (cutoff,))
+        self.conn.commit()
+        return cur.rowcount
+
+    def stats(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"cache: {self.hits} hits, {self.misses} misses ({rate:.0%} hit rate)"
+
+    def close(self):
+        self.conn.close()
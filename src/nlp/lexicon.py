@@ -0,0 +1,57 @@
+import re
+
+# finance polarity words, in the spirit of Loughran-McDonald but only the
+# common headline vocabulary; stems are listed with their usual inflections
+POSITIVE = frozenset("""
+    beat beats beating tops topped exceeds exceeded outperform outperforms outperformed
+    surge surges surged soar soars soared jump jumps jumped gain gains gained rally rallies rallied
+    rise rises rose rising climb climbs climbed rebound rebounds rebounded record upgrade upgrades upgraded
+    bullish boost boosts boosted raise raises raised strong stronger strongest robust
+    profit profits profitable growth grows grew expand expands expanded win wins won
+    approval approve approves approved breakthrough upbeat optimistic buyback
+""".split())
+NEGATIVE = frozenset("""
+    miss misses missed missing plunge plunges plunged slump slumps slumped fall falls fell falling
+    drop drops dropped decline declines declined sink sinks sank tumble tumbles tumbled
+    crash crashes crashed slide slides slid loss losses lose loses lost downgrade downgrades
+    downgraded bearish cut cuts cutting weak weaker weakest layoff layoffs lawsuit lawsuits sue sues
+    sued probe probes investigation fraud recall recalls recalled bankruptcy default defaults
+    warn warns warned warning slowdown delay delays delayed halt halts halted fine fined
+    underperform underperforms underperformed pessimistic downbeat shortfall
+""".split())
+NEGATORS = frozenset("not no never without fails failed fail".split())
+NEGATION_WINDOW = 3  # words after a negator whose polarity flips
+
+_WORD = re.compile(r"[a-z]+")
+
+def lexicon_score(text):
+    """
+    (score, confidence) of one text from polarity word counts. score is
+    (pos - neg) / (pos + neg + 1), so one word gives +-0.5 and mixed texts
+    stay near 0 with low confidence; confidence is |score|. A text with no
+    polarity word scores 0 with confidence 0: absence of evidence is not a
+    neutral call, so the cascade always sends it on to the model.
+    """
+    words = _WORD.findall(text.lower())
+    pos = neg = 0
+    since_negator = NEGATION_WINDOW + 1
+    for w in words:
+        if w in NEGATORS:
+            since_negator = 0
+            continue
+        since_negator += 1
+        flip = since_negator <= NEGATION_WINDOW
+        if w in POSITIVE:
+            pos, neg = (pos, neg + 1) if flip else (pos + 1, neg)
+        elif w in NEGATIVE:
+            pos, neg = (pos + 1, neg) if flip else (pos, neg + 1)
+
+    if not pos and not neg:
+        return 0.0, 0.0
+    score = (pos - neg) / (pos + neg + 1)
+    return score, abs(score)
+
+def lexicon_scores(texts):
+    """lexicon_score of every text, as (scores, confidences) lists."""
+    pairs = [lexicon_score(t) for t in texts]
+    return [s for s, _ in pairs], [c for _, c in pairs]
@@ -0,0 +1,213 @@
+import heapq
+import string
+import zlib
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+NUM_PERM = 64  # MinHash signature length
+BANDS = 16  # LSH bands of NUM_PERM / BANDS rows; pairs above ~0.5 Jaccard become candidates
+THRESHOLD = 0.6  # estimated Jaccard needed to join a cluster
+SHINGLE_WORDS = 2  # words per shingle
+MAX_SHINGLES = 100_000  # shingles hashed per numpy pass, x NUM_PERM x 8 bytes of scratch
+
+# punctuation splits words; $ stays so $TSLA and TSLA differ like they do for the matcher
+_SEPARATORS = str.maketrans({c: " " for c in string.punctuation.replace("$", "") + "\u2018\u2019\u201c\u201d\u2013\u2014\u2026"})
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+def article_texts(df):
+    """
+    The text an article is compared on: the canonical text for mapped rows
+    (those with a text_key), else title + summary. Both scrapers build text
+    as title + summary, so it would only repeat shingles already in the set.
+    """
+    if "text_key" in df.columns:
+        return df["text"].fillna("").tolist()
+    return (df["title"].fillna("") + " " + df["summary"].fillna("")).tolist()
+
+def event_ns(df):
+    """Published time, scrape time when unknown, as int ns (typed frames)."""
+    ts = df["published_utc"].fillna(df["timestamp_utc"])
+    return ts.array.asi8
+
+class NearDupIndex:
+    """
+    Streaming near-duplicate clustering of articles: word-shingle MinHash
+    signatures, banded into an LSH table that maps band hashes to clusters.
+
+    Only each cluster's first article (its representative) is indexed, so
+    memory grows with clusters, not copies. A new article joins the best
+    candidate whose representative agrees on at least THRESHOLD of the
+    signature, otherwise it starts a cluster. Clusters not seen since the
+    evict() cutoff are dropped, keeping the index to a rolling window.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, threshold=THRESHOLD, seed=0):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        rng = np.random.default_rng(seed)
+        # multiply-shift hash family: h(x) = (a * x + b) >> 32, a odd
+        self.a = rng.integers(0, 2**63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+        self.band_mix = rng.integers(0, 2**63, (bands, num_perm // bands), dtype=np.uint64) | np.uint64(1)
+        self.bands = bands
+        self.threshold = threshold
+
+        self.buckets = {}  # band hash -> cluster id
+        self.clusters = {}  # cluster id -> [last seen ns, representative signature bytes]
+        self.expiry = []  # heap of (seen ns, cluster id); entries go stale when a cluster is seen again
+        self.next_id = 0
+
+    def signatures(self, texts):
+        """(n, num_perm) uint32 MinHash signatures and a mask of texts with no words."""
+        tokens = [(t or "").lower().translate(_SEPARATORS).split() for t in texts]
+        counts = np.fromiter(map(len, tokens), dtype=np.intp, count=len(tokens))
+        empty = counts == 0
+
+        sigs = np.full((len(texts), len(self.a)), np.iinfo(np.uint32).max, dtype=np.uint32)
+        if not counts.sum():
+            return sigs, empty
+        flat = np.fromiter(chain.from_iterable(tokens), dtype=object, count=counts.sum())
+
+        # hash each distinct word once, then shingles as mixes of word hashes
+        codes, vocab = pd.factorize(flat)
+        words = np.fromiter((zlib.crc32(w.encode()) for w in vocab), dtype=np.uint64, count=len(vocab))[codes]
+        starts = np.r_[0, np.cumsum(counts)[:-1]]
+        shingles, owner = self._shingles(words, starts, counts)
+
+        # fixed-size numpy passes keep the shingle x permutation matrix bounded
+        lo = 0
+        while lo < len(shingles):
+            hi = min(len(shingles), lo + MAX_SHINGLES)
+            # never split one article's shingles across passes
+            while hi < len(shingles) and owner[hi] == owner[hi - 1]:
+                hi += 1
+            rows = owner[lo:hi]
+            # permutations x shingles, so each article's minimum is a contiguous run
+            hashed = np.multiply(self.a[:, None], shingles[None, lo:hi])
+            hashed += self.b[:, None]
+            hashed >>= np.uint64(32)
+            first = np.r_[0, np.flatnonzero(np.diff(rows)) + 1]
+            sigs[rows[first]] = np.minimum.reduceat(hashed, first, axis=1).T
+            lo = hi
+        return sigs, empty
+
+    @staticmethod
+    def _shingles(words, starts, counts):
+        """Hash of every SHINGLE_WORDS run inside an article (the whole text if shorter)."""
+        n = np.maximum(counts - SHINGLE_WORDS + 1, 1) * (counts > 0)
+        owner = np.repeat(np.arange(len(counts)), n)
+        pos = np.repeat(starts, n) + (np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n))
+        end = np.repeat(starts + counts, n)
+
+        h = words[pos].copy()
+        for k in range(1, SHINGLE_WORDS):
+            more = pos + k < end
+            h[more] = h[more] * _MIX + words[np.minimum(pos + k, len(words) - 1)][more]
+        return h, owner
+
+    def _band_keys(self, sigs):
+        rows = sigs.reshape(len(sigs), self.bands, -1).astype(np.uint64)
+        keys = (rows * self.band_mix).sum(axis=2) + np.arange(self.bands, dtype=np.uint64) * _MIX
+        return keys.tolist()
+
+    def _insert(self, cid, sig, keys, seen):
+        self.clusters[cid] = [seen, None if sig is None else sig.tobytes()]
+        heapq.heappush(self.expiry, (seen, cid))
+        if sig is None:
+            return
+        for key in keys:
+            # a band already owned by another live cluster keeps its owner
+            self.buckets.setdefault(key, cid)
+
+    def assign(self, texts, seen_ns):
+        """Cluster ids for texts, in order; each text can join clusters made by earlier ones."""
+        sigs, empty = self.signatures(texts)
+        keys = self._band_keys(sigs)
+        out = np.empty(len(texts), dtype=np.int64)
+
+        for i, (sig, row_keys, seen) in enumerate(zip(sigs, keys, seen_ns.tolist())):
+            best, best_sim = None, self.threshold
+            if not empty[i]:
+                for cid in {self.buckets[k] for k in row_keys if k in self.buckets}:
+                    rep = np.frombuffer(self.clusters[cid][1], dtype=np.uint32)
+                    sim = (rep == sig).mean()
+                    if sim >= best_sim:
+                        best, best_sim = cid, sim
+
+            if best is None:
+                best = self.next_id
+                self.next_id += 1
+                # nothing to compare an empty text on: a cluster of its own, never matched
+                self._insert(best, None if empty[i] else sig, row_keys, seen)
+            else:
+                rec = self.clusters[best]
+                rec[0] = max(rec[0], seen)
+            out[i] = best
+        return out
+
+    def load(self, texts, seen_ns, cluster_ids):
+        """Rebuild state from already clustered articles (e.g. the mapped table on restart)."""
+        if not len(texts):
+            return
+        cluster_ids = np.asarray(cluster_ids, dtype=np.int64)
+        _, first = np.unique(cluster_ids, return_index=True)
+        sigs, empty = self.signatures([texts[i] for i in first])
+        keys = self._band_keys(sigs)
+        last = pd.Series(seen_ns).groupby(cluster_ids).max()
+
+        for i, sig, row_keys, is_empty in zip(first, sigs, keys, empty):
+            cid = int(cluster_ids[i])
+            self._insert(cid, None if is_empty else sig, row_keys, int(last[cid]))
+        self.next_id = max(self.next_id, int(cluster_ids.max()) + 1)
+
+    def evict(self, cutoff_ns):
+        """Drop clusters last seen before cutoff_ns; returns how many."""
+        old = []
+        while self.expiry and self.expiry[0][0] < cutoff_ns:
+            _, cid = heapq.heappop(self.expiry)
+            rec = self.clusters.get(cid)
+            if rec is None:
+                continue
+            if rec[0] >= cutoff_ns:
+                # seen again since this entry was pushed
+                heapq.heappush(self.expiry, (rec[0], cid))
+            else:
+                old.append((cid, self.clusters.pop(cid)[1]))
+
+        indexed = [(cid, sig) for cid, sig in old if sig is not None]
+        if indexed:
+            sigs = np.frombuffer(b"".join(sig for _, sig in indexed), dtype=np.uint32).reshape(len(indexed), -1)
+            for (cid, _), row_keys in zip(indexed, self._band_keys(sigs)):
+                for key in row_keys:
+                    if self.buckets.get(key) == cid:
+                        del self.buckets[key]
+        return len(old)
+
+    def __len__(self):
+        return len(self.clusters)
+
+def cluster_frame(df, index):
+    """
+    Mapped rows (one per article x ticker) -> the same rows with cluster_id.
+    Each article is clustered once, in row order.
+    """
+    if df.empty:
+        return df.assign(cluster_id=pd.Series(dtype="int64"))
+    texts = article_texts(df)
+    keys = df["url"].fillna("").astype(str)
+    keys = keys.where(keys != "", pd.Series(texts, index=df.index))
+    codes, uniques = pd.factorize(keys)
+    first = pd.Series(np.arange(len(codes))).groupby(codes).first().to_numpy()
+
+    ids = index.assign([texts[i] for i in first], event_ns(df.iloc[first]))
+    return df.assign(cluster_id=ids[codes])
+
+def load_index(mapped, index=None):
+    """A NearDupIndex holding the clusters of an already clustered mapped table."""
+    index = index or NearDupIndex()
+    if not mapped.empty and "cluster_id" in mapped.columns:
+        known = mapped[mapped["cluster_id"].notna()]
+        index.load(article_texts(known), event_ns(known), known["cluster_id"].to_numpy())
+    return index
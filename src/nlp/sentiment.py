@@ -1,66 +1,381 @@
+import argparse
+import multiprocessing as mp
 import os
+import time
+from contextlib import nullcontext
+from itertools import islice
+
+import numpy as np
 import pandas as pd
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
 from tqdm import tqdm
 
-def load_mapped():
-    path = "data/processed/news_all_mapped.csv"
+from src.nlp.backends import BACKENDS, OnnxModel, export_onnx, model_fingerprint, onnx_path, quantize_int8
+from src.metrics import stage, step
+from src.config import SENTIMENT_CASCADE
+from src.nlp.cache import SentimentCache, text_key
+from src.nlp.lexicon import lexicon_scores
+from src.nlp.text import mapped_texts
+from src.storage import read_table, table_exists, write_table
 
-    if not os.path.exists(path):
+MODEL_NAME = "ProsusAI/finbert"
+# point at a saved snapshot directory to run without network access
+MODEL_PATH = os.getenv("FINBERT_PATH", MODEL_NAME)
+MAX_LENGTH = 256  # tokens per input; longer texts are truncated
+MAX_BATCH_TOKENS = 4096  # padded tokens per batch, 16 x 256 at worst
+CLUSTER_MEMO = 50_000  # cluster scores a long-running scorer remembers
+
+LEXICON_TIER = "lexicon"
+MODEL_TIER = "model"
+TIERS = [LEXICON_TIER, MODEL_TIER]
+
+MAPPED = "news_all_mapped"
+SENTIMENT = "news_all_sentiment"
+
+def load_mapped():
+    if not table_exists(MAPPED):
         raise SystemExit(
             "Mapped file not found. Run: python -m src.scrape.map_tickers"
         )
 
-    df = pd.read_csv(path)
+    df = read_table(MAPPED)
     if df.empty:
         raise SystemExit("Mapped file is empty. Not enough news yet.")
 
-    return path, df
+    return df
 
-def load_model():
-    tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert")
-    model = AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert")
-    model.eval()
+def load_model(backend="torch", model_path=MODEL_PATH, threads=None):
+    """
+    backend: "torch" (fp32), "int8" (dynamic quantization) or "onnx" (ONNX
+    Runtime session, exported from the torch model on first use). threads
+    caps the ONNX session's intra-op threads; torch takes its count from
+    torch.set_num_threads.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+
+    if backend == "onnx":
+        # the session only needs the tokenizer next to it, not the torch weights
+        path = ensure_onnx(model_path)
+        return _load_tokenizer(model_path), OnnxModel(path, threads)
+
+    tokenizer, model = _load_tokenizer(model_path), _load_torch(model_path)
+    if backend == "int8":
+        model = quantize_int8(model)
     return tokenizer, model
 
-@torch.no_grad()
-def score_texts(texts, tokenizer, model, batch_size=16, max_length=256):
-    scores = []
-    confs = []
+def _load_tokenizer(model_path):
+    return AutoTokenizer.from_pretrained(model_path, local_files_only=os.path.isdir(model_path))
+
+def _load_torch(model_path):
+    model = AutoModelForSequenceClassification.from_pretrained(model_path, local_files_only=os.path.isdir(model_path))
+    model.eval()
+    return model
+
+def ensure_onnx(model_path=MODEL_PATH):
+    """Path of the ONNX export of model_path, exporting it first if missing."""
+    path = onnx_path(model_path)
+    if not os.path.exists(path):
+        export_onnx(_load_torch(model_path), _load_tokenizer(model_path), path)
+        print(f"Exported ONNX model -> {path}")
+    return path
+
+def model_id(backend="torch", model_path=MODEL_PATH):
+    """
+    Cache key for a model/backend pair; quantized scores differ from fp32,
+    and a changed checkpoint at the same path must not reuse old scores.
+    """
+    key = f"{model_path}@{model_fingerprint(model_path)}"
+    return key if backend == "torch" else f"{key}:{backend}"
+
+def _to_scores(logits):
+    probs = torch.softmax(logits, dim=1)
+
+    # For this FinBERT: [negative, neutral, positive]
+    neg = probs[:, 0].cpu().numpy()
+    pos = probs[:, 2].cpu().numpy()
 
-    for i in tqdm(range(0, len(texts), batch_size)):
-        batch = texts[i:i+batch_size]
+    score = pos - neg
+    conf = probs.max(dim=1).values.cpu().numpy()
+    return score, conf
+
+def token_budget_batches(lengths, max_tokens):
+    """
+    Group indices into batches sorted by token length. A batch is padded to
+    its longest member, so its cost is len(batch) * longest; batches grow
+    until that would exceed max_tokens.
+    """
+    order = np.argsort(lengths, kind="stable")
+    batch = []
+    longest = 0
+
+    for i in order:
+        n = int(lengths[i])
+        if batch and (len(batch) + 1) * max(longest, n) > max_tokens:
+            yield batch
+            batch, longest = [], 0
+        batch.append(int(i))
+        longest = max(longest, n)
+
+    if batch:
+        yield batch
+
+@torch.no_grad()
+def _score_batch(batch, tokenizer, model, max_length):
+    with step("tokenize"):
         enc = tokenizer(batch, padding=True, truncation=True, max_length=max_length, return_tensors="pt")
-        logits = model(**enc).logits
-        probs = torch.softmax(logits, dim=1)
+    with step("forward"):
+        return _to_scores(model(**enc).logits)
+
+@torch.no_grad()
+def _score_encoded(enc, idx, tokenizer, model):
+    with step("tokenize"):
+        features = [{k: enc[k][i] for k in enc.keys()} for i in idx]
+        padded = tokenizer.pad(features, return_tensors="pt")
+    with step("forward"):
+        return _to_scores(model(**padded).logits)
+
+# per-process model for pool workers, loaded once by _init_worker
+_worker = {}
+
+def _init_worker(backend, model_path, threads):
+    torch.set_num_threads(threads)
+    _worker["tokenizer"], _worker["model"] = load_model(backend, model_path, threads)
+
+def _worker_score(args):
+    batch, max_length = args
+    return _score_batch(batch, _worker["tokenizer"], _worker["model"], max_length)
+
+def make_pool(workers, backend="torch", model_path=MODEL_PATH, threads=None):
+    """
+    Process pool where each worker holds its own model. Batches are handed
+    out from the pool's shared task queue as workers free up.
+    """
+    threads = threads or max(1, (os.cpu_count() or 1) // workers)
+    if backend == "onnx":
+        # export once here; workers racing to export would each pay for it
+        # and could load one another's half-written file
+        ensure_onnx(model_path)
+    ctx = mp.get_context("spawn")
+    return ctx.Pool(workers, initializer=_init_worker, initargs=(backend, model_path, threads))
+
+@torch.no_grad()
+def _run_model(texts, tokenizer, model, batch_size=16, max_length=256, max_tokens=None, pool=None, lengths=None):
+    enc = None
+    if max_tokens is None:
+        batches = [list(range(i, min(i+batch_size, len(texts)))) for i in range(0, len(texts), batch_size)]
+    else:
+        # tokenize once unpadded, then pad each length-sorted batch on its own
+        with step("tokenize"):
+            enc = tokenizer(texts, truncation=True, max_length=max_length)
+        n_tokens = [len(ids) for ids in enc["input_ids"]]
+        batches = list(token_budget_batches(n_tokens, max_tokens))
+        if lengths is not None:
+            lengths.update(zip(texts, n_tokens))
+
+    if pool is not None:
+        # imap keeps submission order, so results stream back batch by batch
+        results = pool.imap(_worker_score, (([texts[i] for i in idx], max_length) for idx in batches))
+    elif enc is not None:
+        results = (_score_encoded(enc, idx, tokenizer, model) for idx in batches)
+    else:
+        results = (_score_batch([texts[i] for i in idx], tokenizer, model, max_length) for idx in batches)
+
+    scores = np.zeros(len(texts))
+    confs = np.zeros(len(texts))
+
+    # workers tokenize and run the model in their own processes; the parent
+    # can only see how long it waited for them
+    with step("workers") if pool is not None else nullcontext():
+        for idx, (score, conf) in zip(batches, tqdm(results, total=len(batches))):
+            scores[idx] = score
+            confs[idx] = conf
+
+    return scores.tolist(), confs.tolist()
+
+def score_texts(texts, tokenizer, model, batch_size=16, max_length=256, cache=None, max_tokens=None, pool=None,
+                lengths=None):
+    """
+    Score texts with the model. When a SentimentCache is given, only texts
+    it has not seen before go through inference; the rest are read back.
 
-        # For this FinBERT: [negative, neutral, positive]
-        neg = probs[:, 0].cpu().numpy()
-        pos = probs[:, 2].cpu().numpy()
+    With max_tokens set, inputs are sorted by token length and batched by a
+    padded-token budget instead of fixed batch_size slices; output order is
+    unchanged. With a pool from make_pool, batches run in its worker
+    processes and model can be None. A lengths dict, with max_tokens set,
+    gets text -> token count for the texts that went through the model,
+    from the same tokenizer pass that batches them.
+    """
+    if cache is None:
+        return _run_model(texts, tokenizer, model, batch_size, max_length, max_tokens, pool, lengths)
 
-        score = pos - neg
-        conf = probs.max(dim=1).values.cpu().numpy()
+    keys = [text_key(t) for t in texts]
+    with step("cache"):
+        known = cache.get_many(keys)
 
-        scores.extend(score.tolist())
-        confs.extend(conf.tolist())
+    # first occurrence of each uncached text
+    todo = {}
+    for k, t in zip(keys, texts):
+        if k not in known and k not in todo:
+            todo[k] = t
 
+    if todo:
+        new_scores, new_confs = _run_model(list(todo.values()), tokenizer, model, batch_size, max_length, max_tokens,
+                                           pool, lengths)
+        fresh = list(zip(todo.keys(), new_scores, new_confs))
+        with step("cache"):
+            cache.put_many(fresh)
+        known.update({k: (s, c) for k, s, c in fresh})
+
+    scores = [known[k][0] for k in keys]
+    confs = [known[k][1] for k in keys]
     return scores, confs
 
-def main():
-    path, df = load_mapped()
-    tokenizer, model = load_model()
+def score_cascade(texts, tokenizer, model, threshold, batch_size=16, max_length=256, cache=None, max_tokens=None,
+                  pool=None, lengths=None):
+    """
+    Tiered scoring: the finance lexicon scores every text, and only those it
+    is less than threshold confident about go through score_texts. Returns
+    (scores, confidences, tiers), tiers naming which one scored each text.
+    """
+    with step("lexicon"):
+        scores, confs = lexicon_scores(texts)
+    scores, confs = np.array(scores), np.array(confs)
+    tiers = np.full(len(texts), LEXICON_TIER, dtype=object)
+
+    escalate = np.flatnonzero(confs < threshold)
+    print(f"Cascade: lexicon scored {len(texts) - len(escalate)} of {len(texts)} articles "
+          f"(confidence >= {threshold}), {len(escalate)} go to the model")
+    if len(escalate):
+        model_scores, model_confs = score_texts([texts[i] for i in escalate], tokenizer, model, batch_size,
+                                                max_length, cache, max_tokens, pool, lengths)
+        scores[escalate], confs[escalate], tiers[escalate] = model_scores, model_confs, MODEL_TIER
+    return scores, confs, tiers
+
+def unique_articles(df, texts):
+    """
+    map_frame gives one row per (article, ticker), so the same story shows up
+    once per ticker it mentions. Collapse rows to one entry per article (url,
+    or text hash when the url is missing), or per near-duplicate cluster when
+    rows carry a cluster_id, and return the texts to score plus the row ->
+    article index used to broadcast scores back.
+    """
+    text_keys = pd.Series([text_key(t) for t in texts], index=df.index)
+    if "url" in df.columns:
+        url = df["url"].fillna("").astype(str)
+        keys = url.where(url != "", text_keys)
+    else:
+        keys = text_keys
+    if "cluster_id" in df.columns:
+        # syndicated copies are scored once, through their first row
+        clustered = df["cluster_id"].notna()
+        keys = keys.where(~clustered, "cluster:" + df["cluster_id"].astype("Int64").astype(str))
+
+    codes, _ = pd.factorize(keys)
+    first = pd.Series(range(len(codes))).groupby(codes).first().to_numpy()
+    return [texts[i] for i in first], codes
+
+def score_frame(df, tokenizer, model, cache=None, pool=None, clusters=None, cascade=SENTIMENT_CASCADE):
+    """
+    Mapped rows -> the same rows with sentiment_score / sentiment_confidence,
+    scored on their canonical text, sentiment_tier (which scorer produced
+    them) and n_tokens, the tokens the model saw (empty for rows whose
+    score came from the cache, the lexicon or an earlier copy).
+
+    cascade: lexicon confidence that skips the model (see score_cascade);
+    None scores everything with the model.
+    clusters: optional dict of cluster_id -> (score, confidence, tier) kept by a
+    long-running caller. Copies of a story scored in an earlier chunk reuse
+    its score; newly scored clusters are added, and the oldest entries are
+    dropped past CLUSTER_MEMO.
+    """
+    texts = mapped_texts(df)
+    uniq_texts, codes = unique_articles(df, texts)
+    ratio = len(texts) / len(uniq_texts) if uniq_texts else 0.0
+    print(f"Dedup: {len(texts)} rows -> {len(uniq_texts)} unique articles ({ratio:.2f}x)")
 
-    texts = (df["title"].fillna("") + " " + df["summary"].fillna("") + " " + df["text"].fillna("")).tolist()
-    scores, confs = score_texts(texts, tokenizer, model)
+    scores = np.zeros(len(uniq_texts))
+    confs = np.zeros(len(uniq_texts))
+    tiers = np.full(len(uniq_texts), MODEL_TIER, dtype=object)
+    todo = np.arange(len(uniq_texts))
+    if clusters is not None and "cluster_id" in df.columns:
+        cids = pd.Series(df["cluster_id"].to_numpy()).groupby(codes).first().tolist()
+        for i, cid in enumerate(cids):
+            if cid in clusters:
+                # move to the end: recently used clusters are dropped last
+                scores[i], confs[i], tiers[i] = clusters[cid] = clusters.pop(cid)
+        todo = np.array([i for i, cid in enumerate(cids) if cid not in clusters], dtype=int)
+        if len(todo) < len(uniq_texts):
+            print(f"Reused scores of {len(uniq_texts) - len(todo)} clusters scored earlier")
+
+    start = time.perf_counter()
+    lengths = {}
+    if len(todo) and cascade is not None:
+        scores[todo], confs[todo], tiers[todo] = score_cascade([uniq_texts[i] for i in todo], tokenizer, model, cascade,
+                                                               max_length=MAX_LENGTH, cache=cache,
+                                                               max_tokens=MAX_BATCH_TOKENS, pool=pool, lengths=lengths)
+    elif len(todo):
+        new_scores, new_confs = score_texts([uniq_texts[i] for i in todo], tokenizer, model, cache=cache,
+                                            max_length=MAX_LENGTH, max_tokens=MAX_BATCH_TOKENS, pool=pool,
+                                            lengths=lengths)
+        scores[todo], confs[todo] = new_scores, new_confs
+    elapsed = time.perf_counter() - start
+    print(f"Scored {len(todo)} articles in {elapsed:.1f}s ({len(todo) / max(elapsed, 1e-9):.1f}/s)")
+    if lengths:
+        n = np.fromiter(lengths.values(), dtype=np.int64, count=len(lengths))
+        print(f"Model inputs: {n.mean():.0f} tokens on average, {(n >= MAX_LENGTH).mean():.1%} at the {MAX_LENGTH}-token limit")
+
+    if clusters is not None and "cluster_id" in df.columns:
+        for i in todo:
+            if pd.notna(cids[i]):
+                clusters[cids[i]] = (float(scores[i]), float(confs[i]), tiers[i])
+        for cid in list(islice(clusters, max(0, len(clusters) - CLUSTER_MEMO))):
+            del clusters[cid]
 
     out = df.copy()
-    out["sentiment_score"] = scores
-    out["sentiment_confidence"] = confs
+    out["sentiment_score"] = scores[codes]
+    out["sentiment_confidence"] = confs[codes]
+    out["sentiment_tier"] = pd.Categorical(tiers[codes], categories=TIERS)
+    out["n_tokens"] = pd.array([lengths.get(t) for t in uniq_texts], dtype="Int64")[codes]
+    return out
+
+def main(backend="torch", workers=1, threads=None, cascade=SENTIMENT_CASCADE):
+    with stage("sentiment") as rec:
+        df = load_mapped()
+        rec["rows_in"] = len(df)
+
+        pool = None
+        with step("load_model"):
+            if workers > 1:
+                # the parent only needs the tokenizer to plan batches
+                tokenizer = _load_tokenizer(MODEL_PATH)
+                model = None
+                pool = make_pool(workers, backend, MODEL_PATH, threads)
+                print(f"Scoring with {workers} worker processes")
+            else:
+                tokenizer, model = load_model(backend)
+
+        cache = SentimentCache(model_id=model_id(backend), max_length=MAX_LENGTH)
+        evicted = cache.evict()
+
+        out = score_frame(df, tokenizer, model, cache=cache, pool=pool, cascade=cascade)
+        print(f"Sentiment {cache.stats()}, evicted {evicted} stale entries")
+        cache.close()
+        if pool is not None:
+            pool.close()
+            pool.join()
 
-    out_path = path.replace("_mapped.csv", "_sentiment.csv")
-    out.to_csv(out_path, index=False)
+        out_path = write_table(out, SENTIMENT)
+        rec["rows_out"] = len(out)
     print(f"Saved -> {out_path}")
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backend", choices=BACKENDS, default="torch")
+    ap.add_argument("--workers", type=int, default=1, help="scoring processes, each with its own model")
+    ap.add_argument("--threads", type=int, default=None, help="torch threads per worker (default: cores / workers)")
+    ap.add_argument("--cascade", type=float, default=SENTIMENT_CASCADE, metavar="CONFIDENCE",
+                    help="score with the finance lexicon first; only texts below this confidence go to the model")
+    args = ap.parse_args()
+    main(backend=args.backend, workers=args.workers, threads=args.threads, cascade=args.cascade)
@@ -0,0 +1,85 @@
+import html
+import re
+
+import numpy as np
+
+from src.nlp.cache import text_key
+
+_TAG = re.compile(r"<(script|style)\b.*?</\1\s*>|<[^>]*>", flags=re.IGNORECASE | re.DOTALL)
+
+# feed and API furniture that says nothing about the story
+BOILERPLATE = [
+    r"The post .{1,300}? appeared first on .{1,100}?\.?\s*$",  # WordPress feeds
+    r"\[\+\d+ chars\]\s*$",  # NewsAPI content cut-off
+    r"\b(Continue reading|Read more|Read the full (article|story))\b\s*(\.\.\.|…|»|>>)?\s*$",
+]
+_BOILERPLATE = re.compile("|".join(f"(?:{p})" for p in BOILERPLATE), flags=re.IGNORECASE)
+_MARKERS = ("appeared first on", "chars]", "continue reading", "read more", "read the full")
+BOILERPLATE_TAIL = 450  # chars at the end of a field searched for it
+
+def clean(value):
+    """One field as plain text: markup stripped, entities decoded, boilerplate and extra whitespace removed."""
+    if not isinstance(value, str) or not value:
+        return ""
+    if "<" in value or "&" in value:
+        value = html.unescape(_TAG.sub(" ", value))
+        # escaped markup, e.g. &lt;p&gt; in a feed summary, is only markup once decoded
+        if "<" in value:
+            value = _TAG.sub(" ", value)
+    value = " ".join(value.split())
+    # boilerplate only ever trails the field; most fields have none, so look for a marker first
+    start = max(0, len(value) - BOILERPLATE_TAIL)
+    tail = value[start:].lower()
+    if not any(marker in tail for marker in _MARKERS):
+        return value
+    m = _BOILERPLATE.search(value, start)
+    return value[:m.start()].rstrip() if m else value
+
+def canonical_text(title, summary="", text=""):
+    """
+    The text an article is mapped and scored on. The scrapers set text to
+    title + summary and summaries often open with the title, so each field
+    drops any leading copy of an earlier one and is skipped when what is
+    left already appears; the result holds each sentence once.
+    """
+    kept = []
+    for part in (clean(title), clean(summary), clean(text)):
+        stripped = True
+        while part and stripped:
+            stripped = False
+            for prev in kept:
+                rest = part[len(prev):]
+                if part[:len(prev)].lower() == prev.lower() and not rest[:1].isalnum():
+                    part = rest.lstrip(" -:|.")
+                    stripped = True
+        if part and part.lower() not in " ".join(kept).lower():
+            kept.append(part)
+    return " ".join(kept)
+
+def canonical_texts(df):
+    """canonical_text of every row of a frame with title/summary/text columns (missing ones count as empty)."""
+    cols = [df[c].tolist() if c in df.columns else [""] * len(df) for c in ("title", "summary", "text")]
+    return [canonical_text(*fields) for fields in zip(*cols)]
+
+def mapped_texts(df):
+    """
+    Canonical text of each mapped row: the one map_frame stored where it
+    wrote a text_key, built here for rows mapped before it did.
+    """
+    if "text_key" not in df.columns:
+        return canonical_texts(df)
+    texts = df["text"].tolist()
+    old = np.flatnonzero(df["text_key"].isna().to_numpy())
+    if len(old):
+        for i, t in zip(old, canonical_texts(df.iloc[old])):
+            texts[i] = t
+    return texts
+
+def text_keys(texts):
+    """Stable key of each canonical text; the sentiment cache's key for it too."""
+    return [text_key(t) for t in texts]
+
+def token_lengths(texts, tokenizer, max_length=None):
+    """Tokens the model sees for each text, [CLS]/[SEP] included, capped at max_length."""
+    ids = tokenizer(list(texts), truncation=max_length is not None, max_length=max_length)["input_ids"]
+    return np.fromiter(map(len, ids), dtype=np.int64, count=len(ids))
@@ -0,0 +1,242 @@
+import argparse
+import queue
+import threading
+import time
+
+import pandas as pd
+
+from src.config import ALIASES, WINDOW_HOURS
+from src.metrics import stage, step
+from src.nlp import sentiment
+from src.nlp.cache import SentimentCache
+from src.scrape.fetch import Fetcher
+from src.scrape.map_tickers import MAPPED, MAPPER, map_all_raw, map_new, near_dup_index
+from src.scrape.news_api import API_KEY, scrape_watchlist
+from src.scrape.news_rss import fetch_rss
+from src.scrape.store import ArticleStore
+from src.signals import make_signals
+from src.signals.incremental import SignalAggregator
+from src.storage import append_window, in_window, read_table, table_exists, write_table
+
+SCRAPE_INTERVAL = 300  # seconds between RSS polls
+NEWSAPI_INTERVAL = 3600  # NewsAPI is quota-billed; poll it less often
+QUEUE_SIZE = 4  # mapped chunks waiting for the model before scraping blocks
+
+def scrape(store, fetcher, newsapi=True):
+    added = store.add(*fetch_rss(fetcher=fetcher, state=store))
+    if newsapi and API_KEY:
+        added += store.add(scrape_watchlist(ALIASES, fetcher=fetcher))
+    return added
+
+def run_once(backend="torch"):
+    """The same steps as `make run`, in one process."""
+    store = ArticleStore()
+    scrape(store, Fetcher())
+    map_all_raw(store)
+    store.close()
+    sentiment.main(backend=backend)
+    make_signals.main()
+
+def unscored(mapped, scored):
+    """
+    Mapped rows with no (url, ticker) match among the scored rows: chunks
+    that were queued but never scored, because the scorer skipped them or
+    the process stopped first.
+    """
+    if mapped.empty or scored.empty:
+        return mapped
+    key = lambda df: df["url"].astype(str) + " " + df["ticker"].astype(str)
+    return mapped[~key(mapped).isin(key(scored))].reset_index(drop=True)
+
+class Pipeline:
+    """
+    Long-running scrape -> map -> score -> signals service.
+
+    Three threads joined by bounded queues: the scraper polls feeds on a
+    schedule and maps what is new, the scorer keeps the model loaded and
+    scores each chunk, and the signal stage (the calling thread) folds scored
+    rows into the in-memory window and a SignalAggregator, so each chunk only
+    recomputes the ticker-hours it touches, and rewrites the outputs. A full queue
+    blocks the stage before it, so a slow model holds back scraping instead of
+    piling up work in memory.
+
+    A chunk that fails is logged and skipped. The mapper's watermark moves
+    once a chunk is queued, so on start run() re-queues the in-window mapped
+    rows that never reached the sentiment table. A thread that exits for good
+    (e.g. the model cannot be loaded) still sends its end-of-stream marker,
+    and run() stops once either worker is gone rather than waiting forever.
+    """
+
+    def __init__(self, backend="torch", interval=SCRAPE_INTERVAL, newsapi_interval=NEWSAPI_INTERVAL):
+        self.backend = backend
+        self.interval = interval
+        self.newsapi_interval = newsapi_interval
+        self.mapped = queue.Queue(maxsize=QUEUE_SIZE)
+        self.scored = queue.Queue(maxsize=QUEUE_SIZE)
+        self.stop = threading.Event()
+        self.closed = threading.Event()  # run() no longer reads self.scored
+        self.scorer = None
+
+    def _put(self, q, item, reader_gone):
+        """q.put that waits while the reader is busy but gives up once reader_gone() says it has exited."""
+        while True:
+            try:
+                q.put(item, timeout=1.0)
+                return True
+            except queue.Full:
+                if reader_gone():
+                    return False
+
+    def scrape_loop(self):
+        scorer_gone = lambda: self.scorer is not None and not self.scorer.is_alive()
+        store = None
+        try:
+            # sqlite connections belong to the thread that opened them
+            store = ArticleStore()
+            fetcher = Fetcher()
+            last_newsapi = 0.0
+            # near-duplicate clusters stay in memory between scrapes
+            index = near_dup_index()
+
+            while not self.stop.is_set() and not scorer_gone():
+                started = time.monotonic()
+                newsapi = started - last_newsapi >= self.newsapi_interval
+                try:
+                    with stage("scrape") as rec:
+                        try:
+                            with step("fetch"):
+                                added = scrape(store, fetcher, newsapi=newsapi)
+                        except Exception as e:
+                            print(f"scrape failed: {e}")
+                            added = 0
+                        if newsapi:
+                            last_newsapi = started
+
+                        mapped, next_id, _ = map_new(store, MAPPER, index)
+                        if not mapped.empty:
+                            # blocks while the scorer is QUEUE_SIZE chunks behind
+                            with step("queue_wait"):
+                                if not self._put(self.mapped, (started, mapped), scorer_gone):
+                                    break
+                            append_window(MAPPED, mapped)
+                        # only once the chunk is queued and saved; a failed map is retried next time
+                        store.set_watermark(MAPPER, next_id)
+                        rec["rows_out"] = len(mapped)
+                    print(f"scrape: {added} new articles, {len(mapped)} mapped rows queued")
+                except Exception as e:
+                    print(f"map failed, retrying next scrape: {e}")
+
+                self.stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        except Exception as e:
+            print(f"scraper stopped: {e}")
+        finally:
+            self._put(self.mapped, None, scorer_gone)
+            if store is not None:
+                store.close()
+
+    def score_loop(self):
+        cache = None
+        try:
+            tokenizer, model = sentiment.load_model(self.backend)
+            cache = SentimentCache(model_id=sentiment.model_id(self.backend), max_length=sentiment.MAX_LENGTH)
+            clusters = {}  # cluster_id -> score, so later copies of a story skip the model
+
+            while True:
+                item = self.mapped.get()
+                if item is None:
+                    break
+                started, mapped = item
+                try:
+                    with stage("score", rows_in=len(mapped)) as rec:
+                        cache.evict()
+                        scored = sentiment.score_frame(mapped, tokenizer, model, cache=cache, clusters=clusters)
+                        rec["rows_out"] = len(scored)
+                except Exception as e:
+                    print(f"scoring failed, skipping {len(mapped)} mapped rows until restart: {e}")
+                    continue
+                with step("queue_wait"):
+                    if not self._put(self.scored, (started, scored), self.closed.is_set):
+                        break
+        except Exception as e:
+            print(f"scorer stopped: {e}")
+        finally:
+            self._put(self.scored, None, self.closed.is_set)
+            if cache is not None:
+                cache.close()
+
+    def run(self):
+        window = read_table(sentiment.SENTIMENT) if table_exists(sentiment.SENTIMENT) else pd.DataFrame()
+        window = window[in_window(window)] if not window.empty else window
+        agg = SignalAggregator()
+        agg.update(make_signals.first_copies(window))
+
+        # mapped rows past the mapper's watermark that were never scored
+        backlog = read_table(MAPPED) if table_exists(MAPPED) else pd.DataFrame()
+        backlog = unscored(backlog[in_window(backlog)] if not backlog.empty else backlog, window)
+        if not backlog.empty:
+            print(f"re-queueing {len(backlog)} mapped rows left unscored")
+            self.mapped.put((time.monotonic(), backlog))
+
+        self.scorer = threading.Thread(target=self.score_loop, name="score", daemon=True)
+        scraper = threading.Thread(target=self.scrape_loop, name="scrape", daemon=True)
+        threads = [scraper, self.scorer]
+        for t in threads:
+            t.start()
+
+        try:
+            while True:
+                try:
+                    item = self.scored.get(timeout=1.0)
+                except queue.Empty:
+                    # the scorer always ends with None; this only catches it dying without one
+                    if not self.scorer.is_alive():
+                        print("scorer exited; stopping")
+                        break
+                    continue
+                if item is None:
+                    break
+                started, scored = item
+
+                try:
+                    with stage("signals", rows_in=len(scored)) as rec:
+                        cutoff = pd.Timestamp.utcnow() - pd.Timedelta(hours=WINDOW_HOURS)
+                        with step("evict"):
+                            window = window[in_window(window)] if not window.empty else window
+                            agg.evict(cutoff, make_signals.first_copies(window))
+                        counted = make_signals.first_copies(scored, seen=window)
+                        grown = pd.concat([window, scored], ignore_index=True)
+                        write_table(grown, sentiment.SENTIMENT)
+                        with step("aggregate"):
+                            agg.update(counted)
+                            signals = agg.signals()
+                        # only now, so a failed chunk leaves window, file and aggregator in step
+                        window = grown
+                        write_table(signals, make_signals.SIGNALS)
+                        rec["rows_out"] = len(signals)
+                except Exception as e:
+                    print(f"signals failed for {len(scored)} scored rows: {e}")
+                    continue
+                print(f"signals: {len(scored)} new rows, {len(signals)} signal rows, "
+                      f"{time.monotonic() - started:.1f}s from scrape to signal")
+        except KeyboardInterrupt:
+            print("stopping...")
+        finally:
+            self.closed.set()
+            self.stop.set()
+            for t in threads:
+                t.join(timeout=30)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--once", action="store_true", help="run scrape, map, sentiment and signals once and exit")
+    ap.add_argument("--backend", choices=sentiment.BACKENDS, default="torch")
+    ap.add_argument("--interval", type=int, default=SCRAPE_INTERVAL, help="seconds between scrapes")
+    args = ap.parse_args()
+
+    if args.once:
+        run_once(args.backend)
+    else:
+        Pipeline(args.backend, args.interval).run()
+
+if __name__ == "__main__":
+    main()
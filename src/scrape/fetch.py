@@ -0,0 +1,88 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MAX_CONCURRENCY = 8
+PER_HOST_RPS = 4.0  # requests per second to any one host
+TIMEOUT = 15
+RETRIES = 3
+BACKOFF = 0.5  # seconds, doubled per attempt
+MAX_RETRY_AFTER = 60  # seconds; a server asking for a longer wait gets its error back instead
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+USER_AGENT = "market-pulse-ai/1.0 (+https://github.com/tiffnyz/market-pulse-ai)"
+
+class HostRateLimiter:
+    """Spaces out request starts per host so no host sees more than rps."""
+
+    def __init__(self, rps=PER_HOST_RPS):
+        self.interval = 1.0 / rps if rps else 0.0
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class Fetcher:
+    """
+    Shared HTTP client for the scrapers: one pooled session, a cap on requests
+    in flight, per-host rate limiting, timeouts and retry with exponential
+    backoff on connection errors, 429 and 5xx.
+    """
+
+    def __init__(self, concurrency=MAX_CONCURRENCY, rps=PER_HOST_RPS, timeout=TIMEOUT,
+                 retries=RETRIES, backoff=BACKOFF, max_retry_after=MAX_RETRY_AFTER):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_retry_after = max_retry_after
+        self.limiter = HostRateLimiter(rps)
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+
+        for attempt in range(self.retries + 1):
+            self.limiter.wait(url)
+            try:
+                r = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+            else:
+                if r.status_code not in RETRY_STATUS or attempt == self.retries:
+                    return r
+                retry_after = r.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    # don't stall the scrape (and a stop request) for a long quota reset
+                    if int(retry_after) > self.max_retry_after:
+                        return r
+                    time.sleep(int(retry_after))
+                    continue
+            time.sleep(self.backoff * 2 ** attempt)
+
+    def map(self, fn, items):
+        """fn(self, item) for every item, at most `concurrency` at a time, results in input order."""
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return list(pool.map(lambda item: fn(self, item), items))
+
+    def close(self):
+        self.session.close()
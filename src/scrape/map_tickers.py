@@ -1,9 +1,19 @@
-import glob
 import re
+from itertools import chain
+
+import numpy as np
 import pandas as pd
 from src.config import WATCHLIST, ALIASES, WINDOW_HOURS
+from src.metrics import record, stage, step
+from src.nlp.near_dup import NearDupIndex, cluster_frame, load_index
+from src.nlp.text import canonical_texts, text_keys
+from src.scrape.store import ArticleStore
+from src.storage import append_window, in_window, read_table, table_exists, table_path, typed
+
+MAPPED = "news_all_mapped"
+MAPPER = "map_tickers"
 
-def build_patterns():
+def build_patterns(watchlist=WATCHLIST, aliases=ALIASES):
     """
     Build regex patterns for each ticker based on:
     1) the ticker itself (TSLA)
@@ -12,7 +22,7 @@ def build_patterns():
     """
     patterns = {}
 
-    for ticker in WATCHLIST:
+    for ticker in watchlist:
         pieces = []
 
         # ticker forms: TSLA, $TSLA, (TSLA)
@@ -22,7 +32,7 @@ def build_patterns():
         pieces.append(rf"(?<![A-Z0-9]){t}(?![A-Z0-9])")
 
         # aliases: tesla, apple, alphabet, etc.
-        for name in ALIASES.get(ticker, []):
+        for name in aliases.get(ticker, []):
             n = re.escape(name.lower())
             pieces.append(rf"(?<![a-z]){n}(?![a-z])")
 
@@ -30,89 +40,202 @@ def build_patterns():
 
     return patterns
 
-def map_df(df: pd.DataFrame, out_path: str):
-    if df.empty:
-        print("Combined raw dataframe is empty")
-        return
-
-    patterns = build_patterns()
-    rows = []
-
-    for _, r in df.iterrows():
-        text = f"{r.get('title','')} {r.get('summary','')} {r.get('text','')}"
-        text = (text or "").strip()
-        if not text:
-            continue
-
-        matched = []
-        for ticker, rx in patterns.items():
-            if rx.search(text):
-                matched.append(ticker)
-
-        for t in matched:
-            rows.append({
-                "timestamp_utc": r.get("timestamp_utc"),
-                "source": r.get("source", ""),
-                "published_utc": r.get("published_utc", ""),
-                "ticker": t,
-                "title": r.get("title", ""),
-                "summary": r.get("summary", ""),
-                "text": r.get("text", ""),
-                "url": r.get("url", "")
-            })
-
-    out_df = pd.DataFrame(rows)
-    out_df.to_csv(out_path, index=False)
-    print(f"Mapped {len(out_df)} rows -> {out_path}")
-
-def map_all_raw():
-    files = glob.glob("data/raw/news_*.csv") + glob.glob("data/raw/newsapi_*.csv")
-    if not files:
-        raise SystemExit("No raw files found in data/raw/")
-
-    # load and combine
-    dfs = []
-    skipped = 0
-
-    for f in files:
-        try:
-            tmp = pd.read_csv(f)
-            if tmp.empty:
-                skipped += 1
-                continue
-            dfs.append(tmp)
-        except pd.errors.EmptyDataError:
-            skipped += 1
-            continue
-
-    if not dfs:
-        raise SystemExit("All raw files were empty or unreadable. Run the scraper again.")
-
-    df = pd.concat(dfs, ignore_index=True)
-    print(f"Loaded {len(dfs)} raw files, skipped {skipped}")
-
-    # dedupe repeated scrapes
-    if "url" in df.columns:
-        df = df.drop_duplicates(subset=["url"])
-    else:
-        df = df.drop_duplicates()
-
-    # filter for last WINDOW_HOURS hours only
-    if "published_utc" in df.columns:
-        df["published_utc"] = pd.to_datetime(df["published_utc"], utc=True, errors="coerce")
-        cutoff = pd.Timestamp.utcnow() - pd.Timedelta(hours=WINDOW_HOURS)
-        df = df[df["published_utc"].isna() | (df["published_utc"] >= cutoff)]
-    else:
-        # fallback: use scraped time if published is missing (older schema)
-        time_col = "timestamp_utc" if "timestamp_utc" in df.columns else None
-        if time_col:
-            df[time_col] = pd.to_datetime(df[time_col], utc=True, errors="coerce")
-            cutoff = pd.Timestamp.utcnow() - pd.Timedelta(hours=WINDOW_HOURS)
-            df = df[df[time_col].isna() | (df[time_col] >= cutoff)]
-
-    out_path = "data/processed/news_all_mapped.csv"
-    map_df(df, out_path)
+def _trie_regex(keys):
+    """
+    Alternation of keys folded into a prefix trie, e.g. (?:a(?:pple|md)|intel).
+    Python's re tries a flat alternation one branch at a time; the trie form
+    keeps each scan position close to O(key length) for thousands of keys.
+    Optional tails are greedy, so longer keys are still tried first.
+    """
+    trie = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        end = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            body = body + "?" if len(branches) == 1 and len(branches[0]) == 1 else f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+_ALNUM = re.compile(r"[A-Z0-9]", flags=re.IGNORECASE)
+_ALPHA = re.compile(r"[a-z]", flags=re.IGNORECASE)
+
+class TickerMatcher:
+    """
+    Finds every watchlist ticker mentioned in a text with one regex scan,
+    instead of one search per ticker. Same boundaries as build_patterns():
+    tickers may not touch a letter or digit ($TSLA and (TSLA) reduce to
+    this), aliases may not touch a letter; both are case-insensitive.
+
+    The scan uses the looser alias boundary and tries longer keys first at
+    each position (see _trie_regex), so any other key matching at that position is a prefix
+    of the one found. Those prefixes and the exact boundaries are checked
+    per hit.
+    """
+
+    def __init__(self, watchlist=WATCHLIST, aliases=ALIASES):
+        self.order = {t: i for i, t in enumerate(watchlist)}
+
+        # key text -> [(ticker, boundary class)]
+        entries = {}
+        for ticker in watchlist:
+            entries.setdefault(ticker.lower(), []).append((ticker, _ALNUM))
+            for name in aliases.get(ticker, []):
+                if name:
+                    entries.setdefault(name.lower(), []).append((ticker, _ALPHA))
+
+        keys = sorted(entries, key=len, reverse=True)
+        self.rx = re.compile(rf"(?=(?<![a-z])({_trie_regex(keys)})(?![a-z]))", flags=re.IGNORECASE)
+
+        # every key that can match at the same position as `key`
+        self.candidates = {}
+        for key in keys:
+            prefixes = [key[:i] for i in range(len(key), 0, -1) if key[:i] in entries]
+            self.candidates[key] = [(len(k), ticker, cls) for k in prefixes for ticker, cls in entries[k]]
+
+    def _candidates(self, hit):
+        """
+        Candidates of the key a scan hit matched. IGNORECASE also folds
+        characters str.lower() leaves alone (ſ matches s, K matches k),
+        so a hit like "Teſla" is resolved by a case-insensitive fullmatch
+        against the keys, then remembered.
+        """
+        key = hit.lower()
+        if key not in self.candidates:
+            match = next(k for k in self.candidates if re.fullmatch(re.escape(k), hit, flags=re.IGNORECASE))
+            self.candidates[key] = self.candidates[match]
+        return self.candidates[key]
+
+    def find(self, text):
+        """Tickers mentioned in text, in watchlist order."""
+        found = set()
+        for m in self.rx.finditer(text):
+            start = m.start()
+            before = text[start - 1] if start else ""
+            for n, ticker, cls in self._candidates(m.group(1)):
+                if ticker in found:
+                    continue
+                after = text[start + n] if start + n < len(text) else ""
+                if not (before and cls.match(before)) and not (after and cls.match(after)):
+                    found.add(ticker)
+        return sorted(found, key=self.order.get)
+
+# output columns and the value used when the raw frame lacks one
+MAPPED_COLUMNS = {
+    "timestamp_utc": None,
+    "source": "",
+    "published_utc": "",
+    "ticker": None,
+    "title": "",
+    "summary": "",
+    "text": "",
+    "text_key": "",
+    "url": "",
+}
+
+def _column(df, name, default):
+    if name in df.columns:
+        return df[name]
+    return pd.Series([default] * len(df), index=df.index, dtype=object)
+
+def map_frame(df: pd.DataFrame, matcher=None) -> pd.DataFrame:
+    """
+    One output row per (article, mentioned ticker). text is replaced by the
+    canonical text (src.nlp.text) and text_key added; matches come back as
+    (row position, ticker) arrays and the output is a positional take of
+    the input columns.
+    """
+    matcher = matcher or TickerMatcher()
+
+    # matched, deduplicated and scored on one canonical text per article
+    text = canonical_texts(df)
+
+    matches = [matcher.find(t) if t else [] for t in text]
+    counts = np.fromiter((len(m) for m in matches), dtype=np.intp, count=len(matches))
+    if not counts.sum():
+        return pd.DataFrame()
+
+    pos = np.repeat(np.arange(len(df)), counts)
+    tickers = list(chain.from_iterable(matches))
+
+    text = np.array(text, dtype=object)
+    keys = np.empty(len(text), dtype=object)
+    keys[counts > 0] = text_keys(text[counts > 0])
+    computed = {"ticker": tickers, "text": text[pos], "text_key": keys[pos]}
+
+    out = {}
+    for name, default in MAPPED_COLUMNS.items():
+        if name in computed:
+            out[name] = computed[name]
+        else:
+            out[name] = _column(df, name, default).take(pos).reset_index(drop=True)
+    return pd.DataFrame(out)
+
+def near_dup_index():
+    """Near-duplicate index holding the clusters already in the mapped table's window."""
+    if not table_exists(MAPPED):
+        return NearDupIndex()
+    with step("load_clusters"):
+        mapped = read_table(MAPPED)
+        return load_index(mapped[in_window(mapped)] if not mapped.empty else mapped)
+
+def map_new(store, consumer=MAPPER, index=None):
+    """
+    Map the in-window articles added to the store since consumer's watermark
+    and give each one a near-duplicate cluster_id. index carries the clusters
+    between calls (built from the mapped table when None).
+    Returns (mapped rows, watermark to save once they are persisted, previous watermark).
+    """
+    compacted = store.compact()
+
+    # no mapped file (e.g. after make clean) means remapping the whole store
+    last_id = store.watermark(consumer) if table_exists(MAPPED) else 0
+    with step("load"):
+        new, next_id = store.since(last_id)
+    print(f"Loaded {len(new)} new articles since id {last_id}, compacted {compacted}")
+    record(rows_in=len(new))
+
+    new = typed(new)
+    new = new[in_window(new)] if not new.empty else new
+    with step("match"):
+        mapped = map_frame(new) if not new.empty else pd.DataFrame()
+    if mapped.empty:
+        return mapped, next_id, last_id
+
+    mapped = typed(mapped)
+    index = index if index is not None else near_dup_index()
+    with step("cluster"):
+        index.evict((pd.Timestamp.utcnow() - pd.Timedelta(hours=WINDOW_HOURS)).value)
+        mapped = cluster_frame(mapped, index)
+    articles = mapped["url"].nunique()
+    print(f"Near-duplicates: {articles} mapped articles in {mapped['cluster_id'].nunique()} clusters, {len(index)} clusters in window")
+    return mapped, next_id, last_id
+
+def map_all_raw(store=None):
+    """
+    Map only the articles added to the store since the last run and merge them
+    into the mapped file, dropping mapped rows that left the window.
+    """
+    store = store or ArticleStore()
+    with stage("map") as rec:
+        mapped_new, next_id, last_id = map_new(store)
+
+        if not next_id:
+            raise SystemExit("Article store is empty. Run the scraper again.")
 
+        out_df = append_window(MAPPED, mapped_new, fresh=not last_id)
+        store.set_watermark(MAPPER, next_id)
+        rec["rows_out"] = len(mapped_new)
+    print(f"Mapped {len(mapped_new)} new rows, {len(out_df)} in window -> {table_path(MAPPED)}")
 
 if __name__ == "__main__":
     map_all_raw()
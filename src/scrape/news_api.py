@@ -1,17 +1,29 @@
+import math
 import os
 import requests
 from datetime import datetime, timezone
+from itertools import chain
 import pandas as pd
 from dotenv import load_dotenv
 from src.config import WINDOW_HOURS
+from src.metrics import record, stage, step
+from src.scrape.fetch import Fetcher
+from src.scrape.map_tickers import TickerMatcher
+from src.scrape.store import ArticleStore
 
 load_dotenv(".env")
 
 API_KEY = os.getenv("NEWS_API_KEY")
 BASE_URL = "https://newsapi.org/v2/everything"
 
-def fetch_news(query, hours=WINDOW_HOURS, page_size=100):
-    from_dt = (datetime.now(timezone.utc) - pd.Timedelta(hours=hours)).isoformat()
+MAX_QUERY_CHARS = 500  # NewsAPI rejects a longer q
+PAGE_SIZE = 100  # the most NewsAPI returns per request
+MAX_PAGES = 5  # per query; developer keys stop at 100 results anyway
+PACK_FILL = 0.8  # re-packed queries aim this far below max_pages, to absorb estimate error
+
+def fetch_news(query, page=1, from_dt=None, hours=WINDOW_HOURS, page_size=PAGE_SIZE, fetcher=None, base_url=BASE_URL):
+    """One page of results for query: (articles, totalResults)."""
+    from_dt = from_dt or (datetime.now(timezone.utc) - pd.Timedelta(hours=hours)).isoformat()
 
     params = {
         "q": query,
@@ -19,26 +31,139 @@ def fetch_news(query, hours=WINDOW_HOURS, page_size=100):
         "language": "en",
         "sortBy": "publishedAt",
         "pageSize": page_size,
+        "page": page,
         "apiKey": API_KEY,
     }
 
-    r = requests.get(BASE_URL, params=params)
+    get = fetcher.get if fetcher else requests.get
+    r = get(base_url, params=params)
     data = r.json()
-    print("totalResults:", data.get("totalResults"))
+    if data.get("code") == "maximumResultsReached":
+        # the plan's result cap: keep what the earlier pages returned
+        return [], None
     r.raise_for_status()
-    return r.json()["articles"]
+    return data["articles"], data.get("totalResults")
+
+def _term(alias):
+    return f'"{alias}"' if " " in alias else alias
+
+def plan_queries(watchlist, max_chars=MAX_QUERY_CHARS, max_tickers=None, weights=None, budget=None):
+    """
+    Pack the watchlist's alias ORs into as few queries as fit in max_chars
+    (and at most max_tickers tickers each). With weights (expected results
+    per ticker), a query also stops before its weights pass budget.
+    Returns [(query, tickers)]. Tickers are kept whole in watchlist order,
+    except one whose own aliases are longer than max_chars, which is split
+    over several queries.
+    """
+    plans = []
+    terms, tickers, length, weight = [], [], 0, 0.0
 
-def scrape_watchlist(watchlist):
-    rows = []
-    now = datetime.now(timezone.utc).isoformat()
+    def flush():
+        nonlocal terms, tickers, length, weight
+        if terms:
+            plans.append((" OR ".join(terms), tickers))
+        terms, tickers, length, weight = [], [], 0, 0.0
 
     for ticker, aliases in watchlist.items():
-        query = " OR ".join(aliases)
-        articles = fetch_news(query)
+        own = [_term(a) for a in dict.fromkeys(aliases) if a]
+        if not own:
+            continue
+        own_len = sum(map(len, own)) + 4 * (len(own) - 1)
+        w = weights[ticker] if weights else 0.0
+        if terms and (length + 4 + own_len > max_chars
+                      or (max_tickers and len(tickers) >= max_tickers)
+                      or (budget and weight + w > budget)):
+            flush()
+        for term in own:
+            if terms and length + 4 + len(term) > max_chars:
+                flush()
+            length += len(term) + (4 if terms else 0)
+            terms.append(term)
+            if ticker not in tickers:
+                tickers.append(ticker)
+        weight += w
+    flush()
+    return plans
+
+def _estimate(tickers, articles, total, matcher):
+    """
+    Expected results per ticker of a query: its share of the first page's
+    articles (by local attribution) times totalResults. Smoothed, so tickers
+    missing from the first page still get a little and the estimates sum to total.
+    """
+    counts = dict.fromkeys(tickers, 0.5)
+    for a in articles:
+        for t in set(matcher.find(f"{a.get('title') or ''} {a.get('description') or ''}")).intersection(counts):
+            counts[t] += 1
+    scale = total / sum(counts.values())
+    return {t: c * scale for t, c in counts.items()}
+
+def _pages(total, page_size, max_pages):
+    """Pages after the first worth requesting for a query with totalResults total."""
+    if not total:
+        return []
+    return list(range(2, min(math.ceil(total / page_size), max_pages) + 1))
 
+def scrape_watchlist(watchlist, fetcher=None, base_url=BASE_URL, max_chars=MAX_QUERY_CHARS,
+                     max_tickers=None, page_size=PAGE_SIZE, max_pages=MAX_PAGES):
+    """
+    Articles for every ticker in watchlist ({ticker: aliases}), with as few
+    requests as the query length limit allows. Aliases are packed into
+    shared queries (plan_queries) and the first page of each is fetched.
+    A query whose totalResults fits in max_pages gets its remaining pages.
+    One that does not is re-packed: its first page is attributed back to
+    its tickers with the ticker matcher, and the shares give each ticker's
+    expected results, so busy tickers end up in queries of their own
+    instead of crowding out their neighbours. The same attribution reports
+    coverage; the mapping step does the real one.
+    """
+    now = datetime.now(timezone.utc)
+    # one from for every page, so later pages continue the same result set
+    from_dt = (now - pd.Timedelta(hours=WINDOW_HOURS)).isoformat()
+    fetcher = fetcher or Fetcher()
+    fetch = lambda f, job: fetch_news(job[0], job[1], from_dt, page_size=page_size, fetcher=f, base_url=base_url)
+
+    matcher = TickerMatcher(list(watchlist), watchlist)
+
+    # (tickers, articles) of every page fetched; (tickers, got, total) of every query
+    pages, queries = [], []
+    plans = plan_queries(watchlist, max_chars, max_tickers)
+    splits = 0
+    while plans:
+        first = fetcher.map(fetch, [(query, 1) for query, _ in plans])
+        retry, more = [], []
+        for (query, tickers), (articles, total) in zip(plans, first):
+            pages.append((tickers, articles))
+            if total and total > page_size * max_pages and len(tickers) > 1:
+                # re-pack so each new query's expected results fit in max_pages
+                retry += plan_queries({t: watchlist[t] for t in tickers}, max_chars,
+                                      weights=_estimate(tickers, articles, total, matcher),
+                                      budget=PACK_FILL * page_size * max_pages)
+                splits += 1
+                continue
+            queries.append([tickers, len(articles), total])
+            more += [(len(queries) - 1, query, page) for page in _pages(total, page_size, max_pages)]
+        rest = fetcher.map(fetch, [(query, page) for _, query, page in more])
+        for (q, _, _), (articles, _) in zip(more, rest):
+            pages.append((queries[q][0], articles))
+            queries[q][1] += len(articles)
+        plans = retry
+
+    rows, seen = [], set()
+    per_ticker = dict.fromkeys(watchlist, 0)
+    unattributed = 0
+    for tickers, articles in pages:
         for a in articles:
+            found = set(matcher.find(f"{a.get('title') or ''} {a.get('description') or ''}")).intersection(tickers)
+            for t in found:
+                per_ticker[t] += 1
+            unattributed += not found
+            if a["url"] in seen:
+                continue
+            seen.add(a["url"])
             rows.append({
-                "timestamp_utc": now,
+                "timestamp_utc": now.isoformat(),
                 "published_utc": a["publishedAt"],
                 "source": a["source"]["name"],
                 "title": a["title"],
@@ -47,11 +172,25 @@ def scrape_watchlist(watchlist):
                 "url": a["url"],
             })
 
+    truncated = [(tickers, got, total) for tickers, got, total in queries if total and got < total]
+    for tickers, got, total in truncated:
+        print(f"NewsAPI: {got} of {total} results for {', '.join(tickers)} (page limit)")
+    retrieved = sum(len(a) for _, a in pages)
+    print(f"NewsAPI: {len(watchlist)} tickers, {len(pages)} requests ({len(queries) + splits} queries, "
+          f"{splits} split) -> {retrieved} articles ({len(rows)} unique), {retrieved / max(len(pages), 1):.1f} per request")
+    print(f"NewsAPI: {sum(1 for n in per_ticker.values() if not n)} tickers without articles, "
+          f"{unattributed} articles mention none of their query's tickers, {len(truncated)} queries truncated")
+    record(newsapi_requests=len(pages), newsapi_articles=retrieved)
+
     return pd.DataFrame(rows)
 
 if __name__ == "__main__":
     from src.config import ALIASES
-    df = scrape_watchlist(ALIASES)
-    out = "data/raw/newsapi_latest.csv"
-    df.to_csv(out, index=False)
-    print(f"Saved {len(df)} rows -> {out}")
+    store = ArticleStore()
+    with stage("scrape_newsapi") as rec:
+        with step("fetch"):
+            df = scrape_watchlist(ALIASES)
+        with step("store"):
+            added = store.add(df)
+        rec["rows_in"], rec["rows_out"] = len(df), added
+    print(f"Saved {added} new of {len(df)} rows -> {store.path}")
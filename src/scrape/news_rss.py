@@ -1,11 +1,14 @@
 import re
-import time
 from datetime import datetime, timezone
 
 import feedparser
 import pandas as pd
+import requests
 
 from src.config import WATCHLIST, RSS_FEEDS
+from src.metrics import stage, step
+from src.scrape.fetch import Fetcher
+from src.scrape.store import ArticleStore
 
 TICKER_REGEX = re.compile(r"\\b(" + "|".join(WATCHLIST) + r")\\b")
 
@@ -14,41 +17,113 @@ def extract_tickers(text: str):
         return []
     return sorted(set(TICKER_REGEX.findall(text.upper())))
 
-def fetch_rss():
+def _entry_id(entry):
+    return getattr(entry, "id", "") or getattr(entry, "link", "") or getattr(entry, "title", "")
+
+def _feed_rows(source, entries, now):
+    rows = []
+    for entry in entries:
+        published = None
+        if hasattr(entry, "published_parsed") and entry.published_parsed:
+            published = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc).isoformat()
+        elif hasattr(entry, "updated_parsed") and entry.updated_parsed:
+            published = datetime(*entry.updated_parsed[:6], tzinfo=timezone.utc).isoformat()
+        title = getattr(entry, "title", "") or ""
+        summary = getattr(entry, "summary", "") or ""
+        link = getattr(entry, "link", "") or ""
+
+        text = f"{title} {summary}".strip()
+       # tickers = extract_tickers(text)
+
+       # for t in tickers:
+        rows.append({
+            "scraped_utc": now,
+            "published_utc": published,
+            "source": source,
+            "title": title,
+            "summary": summary,
+            "text": text,
+            "url": link
+        })
+    return rows
+
+def _fetch_feed(fetcher, item):
+    source, url, headers = item
+    try:
+        r = fetcher.get(url, headers=headers)
+        if r.status_code != 304:
+            r.raise_for_status()
+    except requests.RequestException as e:
+        # one dead feed should not sink the whole scrape
+        print(f"{source}: fetch failed ({e})")
+        return None
+    return r
+
+def fetch_rss(feeds=RSS_FEEDS, fetcher=None, state=None):
+    """
+    Fetch every feed concurrently. With an ArticleStore as state, feeds are
+    requested conditionally (ETag / Last-Modified, 304 = nothing to do) and
+    entries whose id was already emitted are skipped.
+
+    Returns (rows, pending). Nothing is written to state here: pending holds
+    each feed's new (url, etag, last_modified, last_bytes, guids), to be saved
+    together with the rows by state.add(rows, pending). A crash before then
+    refetches the feed instead of losing its entries.
+    """
     rows = []
+    pending = []
     now = datetime.now(timezone.utc).isoformat()
 
-    for source, url in RSS_FEEDS.items():
-        feed = feedparser.parse(url)
-        for entry in feed.entries:
-            published = None
-            if hasattr(entry, "published_parsed") and entry.published_parsed:
-                published = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc).isoformat()
-            elif hasattr(entry, "updated_parsed") and entry.updated_parsed:
-                published = datetime(*entry.updated_parsed[:6], tzinfo=timezone.utc).isoformat()
-            title = getattr(entry, "title", "") or ""
-            summary = getattr(entry, "summary", "") or ""
-            link = getattr(entry, "link", "") or ""
-
-            text = f"{title} {summary}".strip()
-           # tickers = extract_tickers(text)
-
-           # for t in tickers:
-            rows.append({
-                "scraped_utc": now,
-                "published_utc": published,
-                "source": source,
-                "title": title,
-                "summary": summary,
-                "text": text,
-                "url": link
-            })
-
-
-    return pd.DataFrame(rows)
+    # sqlite handles stay on this thread: read state before fanning out
+    items = []
+    for source, url in feeds.items():
+        headers = {}
+        if state is not None:
+            etag, last_modified, _ = state.feed_state(url)
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        items.append((source, url, headers))
+
+    fetcher = fetcher or Fetcher()
+    responses = fetcher.map(_fetch_feed, items)
+
+    not_modified = saved_bytes = downloaded = entries = skipped = 0
+    for (source, url, _), r in zip(items, responses):
+        if r is None:
+            continue
+        if r.status_code == 304:
+            not_modified += 1
+            if state is not None:
+                saved_bytes += state.feed_state(url)[2] or 0
+            continue
+
+        downloaded += len(r.content)
+        feed_entries = feedparser.parse(r.content).entries
+        entries += len(feed_entries)
+
+        if state is not None:
+            ids = [_entry_id(e) for e in feed_entries]
+            fresh = set(state.unseen(url, ids))
+            feed_entries = [e for e, i in zip(feed_entries, ids) if i in fresh]
+            skipped += len(ids) - len(feed_entries)
+            pending.append((url, r.headers.get("ETag"), r.headers.get("Last-Modified"), len(r.content), list(fresh)))
+
+        rows.extend(_feed_rows(source, feed_entries, now))
+
+    print(
+        f"RSS: {len(items)} feeds, {not_modified} not modified (~{saved_bytes / 1024:.0f} KB saved), "
+        f"{downloaded / 1024:.0f} KB downloaded, {len(rows)} new of {entries} entries ({skipped} already seen)"
+    )
+    return pd.DataFrame(rows), pending
 
 if __name__ == "__main__":
-    df = fetch_rss()
-    out = f"data/raw/news_{int(time.time())}.csv"
-    df.to_csv(out, index=False)
-    print(f"saved {len(df)} rows -> {out}")
+    store = ArticleStore()
+    with stage("scrape_rss") as rec:
+        with step("fetch"):
+            df, pending = fetch_rss(state=store)
+        with step("store"):
+            added = store.add(df, pending)
+        rec["rows_in"], rec["rows_out"] = len(df), added
+    print(f"saved {added} new of {len(df)} rows -> {store.path}")
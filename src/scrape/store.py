@@ -0,0 +1,204 @@
+import argparse
+import glob
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from src.config import WINDOW_HOURS
+
+STORE_PATH = "data/raw/articles.sqlite"
+SEEN_PER_FEED = 5000  # entry ids remembered per feed
+
+ARTICLE_COLUMNS = ["timestamp_utc", "published_utc", "source", "title", "summary", "text", "url"]
+
+def _epoch(values):
+    # RSS and NewsAPI write different ISO 8601 variants; don't infer one format
+    ts = pd.to_datetime(pd.Series(values, dtype=object), utc=True, errors="coerce", format="ISO8601")
+    return [None if pd.isna(t) else t.timestamp() for t in ts]
+
+class ArticleStore:
+    """
+    Append-only, url-deduplicated article store shared by the scrapers and
+    the mapper. Row ids only grow, so a consumer remembers the last id it
+    processed (its watermark) and reads only what came after it.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        # compact() hands freed pages back with incremental_vacuum instead of
+        # rewriting the file; an older store is switched over by one VACUUM
+        if self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self.conn.execute("VACUUM")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp_utc TEXT,
+                published_utc TEXT,
+                source TEXT,
+                title TEXT,
+                summary TEXT,
+                text TEXT,
+                url TEXT UNIQUE,
+                event_ts REAL
+            );
+            CREATE INDEX IF NOT EXISTS articles_event_ts ON articles (event_ts);
+            CREATE TABLE IF NOT EXISTS watermarks (
+                consumer TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS feeds (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                last_bytes INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS seen (
+                feed TEXT NOT NULL,
+                guid TEXT NOT NULL,
+                seen_at REAL NOT NULL,
+                PRIMARY KEY (feed, guid)
+            );
+            """
+        )
+        self.conn.commit()
+
+    def add(self, df, feeds=()):
+        """
+        Insert scraped rows; urls already in the store are skipped. feeds is the
+        pending (url, etag, last_modified, last_bytes, guids) state fetch_rss
+        returns; it is written in the same transaction, so a feed is only marked
+        fetched once its rows are saved. Returns rows added.
+        """
+        rows = self._rows(df) if not df.empty else []
+        with self.conn:  # one transaction: commits on success, rolls back on error
+            for url, etag, last_modified, last_bytes, guids in feeds:
+                self._set_feed_state(url, etag, last_modified, last_bytes)
+                self._mark_seen(url, guids)
+            before = self.conn.total_changes
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO articles ({', '.join(ARTICLE_COLUMNS)}, event_ts) "
+                f"VALUES ({', '.join('?' * (len(ARTICLE_COLUMNS) + 1))})",
+                rows,
+            )
+            return self.conn.total_changes - before
+
+    def _rows(self, df):
+        """Scraped rows as articles-table tuples (ARTICLE_COLUMNS + event_ts)."""
+        df = df.copy()
+        # RSS rows carry their scrape time as scraped_utc
+        if "timestamp_utc" not in df.columns and "scraped_utc" in df.columns:
+            df["timestamp_utc"] = df["scraped_utc"]
+        for col in ARTICLE_COLUMNS:
+            if col not in df.columns:
+                df[col] = None
+        df = df[ARTICLE_COLUMNS].astype(object).where(df[ARTICLE_COLUMNS].notna(), None)
+
+        # published time when known, scrape time otherwise; drives compaction
+        published = _epoch(df["published_utc"])
+        scraped = _epoch(df["timestamp_utc"])
+        event_ts = [p if p is not None else s for p, s in zip(published, scraped)]
+
+        return [(*[None if v is None else str(v) for v in row], ts) for row, ts in zip(df.itertuples(index=False), event_ts)]
+
+    def since(self, last_id=0):
+        """Rows added after last_id, and the id to use as the next watermark."""
+        df = pd.read_sql_query(
+            f"SELECT id, {', '.join(ARTICLE_COLUMNS)} FROM articles WHERE id > ? ORDER BY id",
+            self.conn,
+            params=(last_id,),
+        )
+        next_id = int(df["id"].iloc[-1]) if len(df) else last_id
+        return df.drop(columns=["id"]), next_id
+
+    def watermark(self, consumer):
+        row = self.conn.execute("SELECT last_id FROM watermarks WHERE consumer = ?", (consumer,)).fetchone()
+        return row[0] if row else 0
+
+    def set_watermark(self, consumer, last_id):
+        self.conn.execute("INSERT OR REPLACE INTO watermarks VALUES (?, ?)", (consumer, last_id))
+        self.conn.commit()
+
+    def feed_state(self, url):
+        """(etag, last_modified, last_bytes) from the previous fetch of a feed."""
+        row = self.conn.execute(
+            "SELECT etag, last_modified, last_bytes FROM feeds WHERE url = ?", (url,)
+        ).fetchone()
+        return row or (None, None, None)
+
+    def _set_feed_state(self, url, etag, last_modified, last_bytes):
+        self.conn.execute("INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?)", (url, etag, last_modified, last_bytes))
+
+    def unseen(self, feed, guids):
+        """The subset of guids not yet recorded for this feed."""
+        seen = set()
+        uniq = list(dict.fromkeys(guids))
+        for i in range(0, len(uniq), 500):
+            chunk = uniq[i:i+500]
+            cur = self.conn.execute(
+                f"SELECT guid FROM seen WHERE feed = ? AND guid IN ({','.join('?' * len(chunk))})",
+                [feed, *chunk],
+            )
+            seen.update(g for (g,) in cur)
+        return [g for g in guids if g not in seen]
+
+    def _mark_seen(self, feed, guids, limit=SEEN_PER_FEED):
+        now = time.time()
+        self.conn.executemany("INSERT OR REPLACE INTO seen VALUES (?, ?, ?)", [(feed, g, now) for g in guids])
+        # keep the set bounded: forget the oldest ids beyond the limit
+        self.conn.execute(
+            "DELETE FROM seen WHERE feed = ? AND rowid NOT IN "
+            "(SELECT rowid FROM seen WHERE feed = ? ORDER BY seen_at DESC LIMIT ?)",
+            (feed, feed, limit),
+        )
+
+    def compact(self, hours=WINDOW_HOURS):
+        """
+        Drop articles older than the window. Their urls are forgotten too, which
+        is fine: feeds stop serving items long before WINDOW_HOURS.
+        """
+        cutoff = time.time() - hours * 3600
+        cur = self.conn.execute("DELETE FROM articles WHERE event_ts < ?", (cutoff,))
+        self.conn.commit()
+        if cur.rowcount:
+            # frees only the pages the delete emptied. executescript steps the
+            # pragma to completion; execute() would free a single page
+            self.conn.executescript("PRAGMA incremental_vacuum;")
+        return cur.rowcount
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+def import_raw_files(store):
+    """One-off migration of the old per-run raw CSVs into the store."""
+    files = glob.glob("data/raw/news_*.csv") + glob.glob("data/raw/newsapi_*.csv")
+    added = 0
+    for f in files:
+        try:
+            added += store.add(pd.read_csv(f))
+        except pd.errors.EmptyDataError:
+            continue
+    return len(files), added
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("command", choices=["import-raw", "compact", "stats"])
+    args = ap.parse_args()
+
+    store = ArticleStore()
+    if args.command == "import-raw":
+        n_files, added = import_raw_files(store)
+        print(f"Imported {added} new articles from {n_files} raw files -> {store.path}")
+    elif args.command == "compact":
+        print(f"Dropped {store.compact()} articles older than {WINDOW_HOURS}h")
+    print(f"{store.count()} articles in {store.path}")
+    store.close()
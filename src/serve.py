@@ -0,0 +1,230 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from src.signals.make_signals import SIGNAL_COLUMNS, SIGNALS
+from src.storage import read_table, table_mtime
+
+HOST = "127.0.0.1"
+PORT = 8765
+RELOAD_INTERVAL = 1.0  # seconds between checks for a new signals file
+ACTIONS = ["BUY", "SELL"]
+
+def _json(col):
+    """One column as JSON literals, built without a per-row json.dumps."""
+    if isinstance(col.dtype, pd.DatetimeTZDtype) or col.dtype == object or isinstance(col.dtype, pd.CategoricalDtype):
+        # few distinct values (hours, tickers, signals) or free text: encode each distinct value once
+        codes, uniques = pd.factorize(col)
+        if isinstance(uniques, pd.DatetimeIndex):
+            uniques = uniques.strftime("%Y-%m-%dT%H:%M:%SZ")
+        literals = np.array([json.dumps(str(v)) for v in uniques] + ["null"], dtype=object)
+        return pd.Series(literals[codes], index=col.index)
+    if pd.api.types.is_integer_dtype(col):
+        return col.astype(str).astype(object)
+    # float repr is what json.dumps writes; NaN is not JSON
+    values = col.to_numpy(dtype=float)
+    return pd.Series(list(map(repr, values.tolist())), index=col.index, dtype=object).where(~np.isnan(values), "null")
+
+def _encode(df):
+    """Every row of the signals table as a JSON object string."""
+    rows = None
+    for i, name in enumerate(SIGNAL_COLUMNS):
+        part = ("{" if i == 0 else ",") + json.dumps(name) + ":" + _json(df[name])
+        rows = part if rows is None else rows + part
+    return rows + "}"
+
+class SignalIndex:
+    """
+    Read-only view of one signals table built for lookups: per ticker, its
+    hours as a sorted int64 array next to its rows, plus every BUY/SELL row
+    in one time-sorted array. Rows are JSON-encoded once here, so a query is
+    a dict lookup and a binary search, and answering it is a string join.
+    """
+
+    def __init__(self, df, mtime=None):
+        self.mtime = mtime
+        self.rows = len(df)
+        df = df.sort_values(["hour", "ticker"], kind="stable").reset_index(drop=True)
+
+        encoded = _encode(df).to_numpy()
+        ns = df["hour"].array.asi8
+        ticker = df["ticker"].astype(str).to_numpy()
+        signal = df["signal"].astype(str).to_numpy()
+
+        self.tickers = {}
+        for name, pos in pd.Series(ticker).groupby(ticker, sort=True).indices.items():
+            self.tickers[name] = (ns[pos], encoded[pos].tolist())
+
+        act = np.flatnonzero(np.isin(signal, ACTIONS))
+        self.action_ns = ns[act]
+        self.action_signal = signal[act]
+        self.action_ticker = ticker[act]
+        self.actions = encoded[act]
+
+    def latest(self, tickers=None):
+        """Most recent row of each ticker (all tickers when None); unknown tickers are skipped."""
+        names = self.tickers if tickers is None else tickers
+        return {t: self.tickers[t][1][-1] for t in names if t in self.tickers}
+
+    def range(self, ticker, start=None, end=None):
+        """Rows of ticker with start <= hour <= end (ns, either may be None)."""
+        ns, rows = self.tickers[ticker]
+        lo = 0 if start is None else np.searchsorted(ns, start, "left")
+        hi = len(ns) if end is None else np.searchsorted(ns, end, "right")
+        return rows[lo:hi]
+
+    def since(self, start, signal=None, tickers=None):
+        """BUY/SELL rows with hour >= start, oldest first, optionally one signal / some tickers."""
+        lo = np.searchsorted(self.action_ns, start, "left")
+        keep = np.ones(len(self.actions) - lo, dtype=bool)
+        if signal is not None:
+            keep &= self.action_signal[lo:] == signal
+        if tickers is not None:
+            keep &= np.isin(self.action_ticker[lo:], tickers)
+        return self.actions[lo:][keep].tolist()
+
+def load_index():
+    """SignalIndex of the current signals table, or None when there is none yet."""
+    mtime = table_mtime(SIGNALS)
+    if mtime is None:
+        return None
+    return SignalIndex(read_table(SIGNALS), mtime)
+
+class SignalService:
+    """
+    Holds the current SignalIndex and swaps in a new one whenever the
+    signals file changes. Writers replace the file with a rename, so a
+    reload never sees a half-written table; requests take self.index once and
+    keep using that version even if a reload lands mid-request.
+    """
+
+    def __init__(self, loader=load_index, interval=RELOAD_INTERVAL):
+        self.loader = loader
+        self.interval = interval
+        self.index = loader()
+        self.reloads = 0
+        self.stop = threading.Event()
+
+    def reload_loop(self):
+        while not self.stop.wait(self.interval):
+            mtime = table_mtime(SIGNALS)
+            current = self.index
+            if mtime is None or (current is not None and current.mtime == mtime):
+                continue
+            start = time.perf_counter()
+            try:
+                index = self.loader()
+            except Exception as e:  # keep serving the old index
+                print(f"reload failed: {e}")
+                continue
+            self.index = index
+            self.reloads += 1
+            print(f"reloaded {index.rows} signal rows in {time.perf_counter() - start:.2f}s")
+
+def _ts(value):
+    """Query-string time (ISO 8601, UTC when no offset) -> int ns."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return ts.value
+
+def _list(value):
+    return [v.strip().upper() for v in value.split(",") if v.strip()] if value else None
+
+class QueryError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _rows(rows):
+    return "[" + ",".join(rows) + "]"
+
+def answer(index, path, qs):
+    """JSON body for one request path and parsed query string."""
+    if index is None:
+        raise QueryError(503, "no signals yet; run make signals")
+    arg = lambda name: qs.get(name, [None])[0]
+
+    try:
+        if path == "/latest":
+            latest = index.latest(_list(arg("tickers")))
+            return '{"signals":{' + ",".join(f"{json.dumps(t)}:{row}" for t, row in latest.items()) + "}}"
+        if path == "/range":
+            ticker = (arg("ticker") or "").upper()
+            if ticker not in index.tickers:
+                raise QueryError(404, f"unknown ticker {ticker!r}")
+            start = _ts(arg("start")) if arg("start") else None
+            end = _ts(arg("end")) if arg("end") else None
+            return f'{{"ticker":{json.dumps(ticker)},"signals":{_rows(index.range(ticker, start, end))}}}'
+        if path == "/actions":
+            if not arg("since"):
+                raise QueryError(400, "since is required, e.g. /actions?since=2024-06-01T00:00Z")
+            signal = arg("signal").upper() if arg("signal") else None
+            if signal is not None and signal not in ACTIONS:
+                raise QueryError(400, f"signal must be one of {ACTIONS}")
+            return f'{{"signals":{_rows(index.since(_ts(arg("since")), signal, _list(arg("tickers"))))}}}'
+    except ValueError as e:
+        raise QueryError(400, f"bad time: {e}")
+    if path == "/health":
+        return json.dumps({"rows": index.rows, "tickers": len(index.tickers), "mtime": index.mtime})
+    raise QueryError(404, "paths: /latest, /range, /actions, /health")
+
+class SignalHandler(BaseHTTPRequestHandler):
+    # keep-alive, so clients polling in a loop skip the TCP handshake; no
+    # Nagle, or the body write waits on the client's delayed ACK of the headers
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    service = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        try:
+            self._send(200, answer(self.service.index, parts.path, parse_qs(parts.query)))
+        except QueryError as e:
+            self._send(e.status, json.dumps({"error": str(e)}))
+
+def make_server(service, host=HOST, port=PORT):
+    handler = type("Handler", (SignalHandler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--reload", type=float, default=RELOAD_INTERVAL, help="seconds between checks for new signals")
+    args = ap.parse_args()
+
+    service = SignalService(interval=args.reload)
+    if service.index is None:
+        print("No signals yet; serving 503 until make signals writes them.")
+    threading.Thread(target=service.reload_loop, name="reload", daemon=True).start()
+
+    server = make_server(service, args.host, args.port)
+    print(f"Serving signals on http://{args.host}:{server.server_address[1]} (/latest, /range, /actions, /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop.set()
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
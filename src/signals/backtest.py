@@ -0,0 +1,153 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.signals.make_signals import BUY_DELTA, MIN_VOLUME, SELL_DELTA, compute_signals, load_latest_sentiment
+from src.storage import write_table
+
+PRICES_PATH = "data/raw/prices.csv"  # timestamp,ticker,close
+BACKTEST = "backtest"
+
+HORIZON_HOURS = 4
+MAX_CELLS = 10_000_000  # mask cells per chunk (threshold x volume x signal rows)
+
+def load_prices(path=PRICES_PATH):
+    if not os.path.exists(path):
+        raise SystemExit(f"No price file at {path} (columns: timestamp,ticker,close)")
+    prices = pd.read_csv(path)
+    missing = {"timestamp", "ticker", "close"} - set(prices.columns)
+    if missing:
+        raise SystemExit(f"{path} is missing columns: {', '.join(sorted(missing))}")
+    prices["timestamp"] = pd.to_datetime(prices["timestamp"], utc=True, format="ISO8601")
+    prices["ticker"] = prices["ticker"].astype(str)
+    return prices.dropna(subset=["timestamp", "close"]).sort_values("timestamp", kind="stable")
+
+def forward_returns(signals, prices, horizon=HORIZON_HOURS):
+    """
+    Return from the first price after each ticker-hour closes (when its
+    signal is known) to the first price horizon hours later. NaN where
+    either price is missing.
+    """
+    rows = signals[["ticker", "hour"]].assign(ticker=signals["ticker"].astype(str))
+    rows["entry_at"] = rows["hour"] + pd.Timedelta(hours=1)
+    rows["pos"] = np.arange(len(rows))
+
+    px = prices[["timestamp", "ticker", "close"]]
+    entry = pd.merge_asof(
+        rows.sort_values("entry_at"), px.rename(columns={"timestamp": "entry_at"}),
+        on="entry_at", by="ticker", direction="forward",
+    )
+    entry["exit_at"] = entry["entry_at"] + pd.Timedelta(hours=horizon)
+    trades = pd.merge_asof(
+        entry.sort_values("exit_at"), px.rename(columns={"timestamp": "exit_at", "close": "exit"}),
+        on="exit_at", by="ticker", direction="forward",
+    ).sort_values("pos")
+
+    return (trades["exit"] / trades["close"] - 1).to_numpy()
+
+def _side(delta, volume, ret, thresholds, min_volumes, above, max_cells):
+    """
+    Trade count, hits and summed return for one side of the book, for every
+    (threshold, min_volume) pair at once: a (T, V, N) mask contracted with
+    the per-row returns. Chunked over thresholds to bound memory.
+    """
+    T, V = len(thresholds), len(min_volumes)
+    out = {k: np.empty((T, V)) for k in ("trades", "hits", "ret")}
+    vol_ok = volume[None, :] >= min_volumes[:, None]  # (V, N)
+    win = (ret > 0).astype(float)
+
+    step = max(1, max_cells // max(1, V * len(delta)))
+    for lo in range(0, T, step):
+        t = thresholds[lo:lo + step, None]
+        hit = delta[None, :] > t if above else delta[None, :] < t  # (t, N)
+        mask = (hit[:, None, :] & vol_ok[None, :, :]).astype(float)  # (t, V, N)
+        out["trades"][lo:lo + step] = mask.sum(axis=2)
+        out["hits"][lo:lo + step] = mask @ win
+        out["ret"][lo:lo + step] = mask @ ret
+    return out
+
+def sweep(signals, returns, buy_grid, sell_grid, volume_grid, max_cells=MAX_CELLS):
+    """
+    Hit rate and returns of the BUY/SELL rule for every (buy, sell,
+    min_volume) combination: BUY goes long and SELL short for the horizon.
+    Buy and sell sides are evaluated separately and broadcast together, so
+    the cost is (len(buy) + len(sell)) x len(volume) masks, not their product.
+    """
+    buy_grid, sell_grid = np.asarray(buy_grid, float), np.asarray(sell_grid, float)
+    volume_grid = np.asarray(volume_grid, float)
+    if buy_grid.min() < sell_grid.max():
+        # otherwise a row could pass both tests and classify() would call it SELL
+        raise SystemExit("Every BUY threshold must be >= every SELL threshold")
+
+    ok = ~np.isnan(returns) & signals["sentiment_delta"].notna().to_numpy()
+    delta = signals["sentiment_delta"].to_numpy()[ok]
+    volume = signals["volume"].to_numpy()[ok]
+    ret = returns[ok]
+
+    longs = _side(delta, volume, ret, buy_grid, volume_grid, True, max_cells)
+    shorts = _side(delta, volume, -ret, sell_grid, volume_grid, False, max_cells)
+
+    # (B, 1, V) + (1, S, V) -> (B, S, V)
+    def grid(key):
+        return longs[key][:, None, :] + shorts[key][None, :, :]
+
+    trades, hits, total = grid("trades"), grid("hits"), grid("ret")
+    b, s, v = np.meshgrid(buy_grid, sell_grid, volume_grid, indexing="ij")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = pd.DataFrame({
+            "buy_delta": b.ravel(),
+            "sell_delta": s.ravel(),
+            "min_volume": v.ravel().astype(int),
+            "trades": trades.ravel().astype(int),
+            "buys": np.broadcast_to(longs["trades"][:, None, :], trades.shape).ravel().astype(int),
+            "sells": np.broadcast_to(shorts["trades"][None, :, :], trades.shape).ravel().astype(int),
+            "hit_rate": (hits / trades).ravel(),
+            "mean_return": (total / trades).ravel(),
+            "total_return": total.ravel(),
+        })
+    return out
+
+def grid_arg(spec):
+    """'a:b:step' (inclusive of b) or 'a,b,c' -> array."""
+    if ":" in spec:
+        lo, hi, step = (float(x) for x in spec.split(":"))
+        return np.round(np.arange(lo, hi + step / 2, step), 10)
+    return np.array([float(x) for x in spec.split(",")])
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--prices", default=PRICES_PATH)
+    ap.add_argument("--horizon", type=int, default=HORIZON_HOURS, help="hours each trade is held")
+    ap.add_argument("--buy", type=grid_arg, default=grid_arg("0:0.5:0.01"), help="BUY_DELTA grid, a:b:step or a,b,c")
+    ap.add_argument("--sell", type=grid_arg, default=grid_arg("-0.5:0:0.01"), help="SELL_DELTA grid (write --sell=-0.5:0:0.01, since it starts with a minus)")
+    ap.add_argument("--min-volume", type=grid_arg, default=grid_arg("1:10:1"), help="MIN_VOLUME grid")
+    ap.add_argument("--min-trades", type=int, default=20, help="ignore configs with fewer trades in the ranking")
+    args = ap.parse_args()
+
+    signals = compute_signals(load_latest_sentiment())
+    returns = forward_returns(signals, load_prices(args.prices), args.horizon)
+    print(f"{len(signals)} ticker-hours, {np.isfinite(returns).sum()} with a {args.horizon}h forward return")
+
+    start = time.perf_counter()
+    results = sweep(signals, returns, args.buy, args.sell, args.min_volume)
+    print(f"Evaluated {len(results)} configurations in {time.perf_counter() - start:.2f}s")
+
+    out_path = write_table(results, BACKTEST)
+    print(f"Saved -> {out_path}")
+
+    ranked = results[results["trades"] >= args.min_trades].sort_values("mean_return", ascending=False)
+    print(ranked.head(10).to_string(index=False))
+
+    current = results[
+        np.isclose(results["buy_delta"], BUY_DELTA) & np.isclose(results["sell_delta"], SELL_DELTA)
+        & (results["min_volume"] == MIN_VOLUME)
+    ]
+    if not current.empty:
+        print("current settings:")
+        print(current.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.config import SIGNAL_BASELINES, SIGNAL_RESOLUTIONS
+from src.signals.make_signals import classify, first_copies, load_latest_sentiment
+from src.storage import write_table
+
+MULTI = "signals_multi"
+
+MULTI_INDEX = ["resolution", "baseline", "ticker", "bucket"]
+MULTI_COLUMNS = [
+    "avg_sentiment", "volume", "sentiment_base", "sentiment_delta", "signal", "confidence",
+    "rep_title", "rep_url", "rep_article_sentiment",
+]
+
+def parse_baseline(spec):
+    """'diff', 'rolling:N' or 'ewm:SPAN' -> (kind, n)."""
+    kind, _, n = spec.partition(":")
+    if kind == "diff" and not n:
+        return kind, 1
+    if kind in ("rolling", "ewm") and n.isdigit() and int(n) > 0:
+        return kind, int(n)
+    raise SystemExit(f"Unknown baseline {spec!r}: use diff, rolling:N or ewm:SPAN")
+
+def _resolutions(resolutions):
+    """Resolutions finest first; each one must be a whole multiple of the one before."""
+    try:
+        steps = sorted((pd.Timedelta(pd.tseries.frequencies.to_offset(r)), r) for r in resolutions)
+    except ValueError as e:
+        raise SystemExit(f"Bad resolution: {e}")
+    for (fine, f), (coarse, c) in zip(steps, steps[1:]):
+        if coarse % fine:
+            raise SystemExit(f"Resolution {c} is not a multiple of {f}")
+    return [r for _, r in steps]
+
+def _first_max(keys, value, pos):
+    """Per group of keys: pos of the row with the largest value, smallest pos on ties."""
+    best = value.groupby(keys, observed=True).transform("max")
+    return pos[value == best].groupby([k[value == best] for k in keys], observed=True).min()
+
+def bucket_stats(df, resolutions):
+    """
+    Per-(ticker, bucket) sum, count and representative row for every
+    resolution. Raw rows are grouped once at the finest resolution; coarser
+    ones are rolled up from those groups, since sums and counts add up and
+    the representative is the best of the sub-buckets' representatives.
+    """
+    ts = df["published_utc"].fillna(df["timestamp_utc"])
+    rows = pd.DataFrame({
+        "ticker": df["ticker"].array,
+        "bucket": ts.dt.floor(resolutions[0]).array,
+        "score": df["sentiment_score"].to_numpy(),
+        "abs_sent": df["sentiment_score"].abs().to_numpy(),
+    })
+
+    stats = {}
+    fine = rows.groupby(["ticker", "bucket"], observed=True).agg(
+        sum=("score", "sum"), volume=("score", "count"), avg_sentiment=("score", "mean"), rep=("abs_sent", "idxmax"),
+    )
+    stats[resolutions[0]] = fine
+
+    rep_abs = pd.Series(rows["abs_sent"].to_numpy()[fine["rep"].to_numpy()], index=fine.index)
+    for res in resolutions[1:]:
+        keys = [fine.index.get_level_values("ticker"), fine.index.get_level_values("bucket").floor(res)]
+        coarse = fine.groupby(keys, observed=True)[["sum", "volume"]].sum()
+        coarse.index.names = ["ticker", "bucket"]
+        coarse["avg_sentiment"] = coarse["sum"] / coarse["volume"]
+        # first row in input order among the sub-buckets' top |score| articles
+        coarse["rep"] = _first_max(keys, rep_abs, fine["rep"]).to_numpy()
+        stats[res] = coarse
+    return stats
+
+def _starts(tickers):
+    """Index of the first row of each row's ticker run (rows sorted by ticker)."""
+    new = np.r_[True, tickers[1:] != tickers[:-1]]
+    return np.maximum.accumulate(np.where(new, np.arange(len(tickers)), 0))
+
+def baseline_values(avg, tickers, kind, n):
+    """
+    What each bucket's average is compared against, from earlier buckets of
+    the same ticker only: the previous bucket (diff), the mean of the last n
+    buckets (rolling) or their exponentially weighted mean (ewm).
+    NaN for a ticker's first bucket.
+    """
+    idx = np.arange(len(avg))
+    start = _starts(tickers)
+    first = idx == start
+
+    if kind == "diff":
+        base = np.r_[np.nan, avg[:-1]]
+    elif kind == "rolling":
+        # windowed sums from one cumulative sum, clipped at the ticker start
+        cs = np.r_[0.0, np.cumsum(avg)]
+        lo = np.maximum(idx - n, start)
+        base = (cs[idx] - cs[lo]) / np.maximum(idx - lo, 1)
+    else:
+        ewm = pd.Series(avg).groupby(tickers).ewm(span=n).mean().sort_index(level=1).to_numpy()
+        base = np.r_[np.nan, ewm[:-1]]
+
+    base[first] = np.nan
+    return base
+
+def compute_multi(df, resolutions=SIGNAL_RESOLUTIONS, baselines=SIGNAL_BASELINES):
+    """
+    Signals for every resolution x baseline combination in one pass, indexed
+    by (resolution, baseline, ticker, bucket) and sorted on that index, so
+    multi.loc[("h", "ewm:12")] is a cheap slice.
+    """
+    df = first_copies(df)
+    resolutions = _resolutions(resolutions)
+    baselines = [(b, *parse_baseline(b)) for b in baselines]
+    stats = bucket_stats(df, resolutions)
+
+    titles = df["title"].to_numpy()
+    urls = df["url"].to_numpy()
+    scores = df["sentiment_score"].to_numpy()
+
+    # every variant shares its resolution's bucket stats; columns are built
+    # as arrays and classified together once
+    cols = {c: [] for c in MULTI_INDEX + ["avg_sentiment", "volume", "sentiment_base", "rep"]}
+    for r, res in enumerate(resolutions):
+        st = stats[res]
+        avg = st["avg_sentiment"].to_numpy()
+        tickers = st.index.get_level_values("ticker").to_numpy()
+
+        for b, (_, kind, n) in enumerate(baselines):
+            cols["resolution"].append(np.full(len(st), r, dtype=np.int8))
+            cols["baseline"].append(np.full(len(st), b, dtype=np.int8))
+            cols["ticker"].append(tickers)
+            cols["bucket"].append(st.index.get_level_values("bucket"))
+            cols["avg_sentiment"].append(avg)
+            cols["volume"].append(st["volume"].to_numpy())
+            cols["sentiment_base"].append(baseline_values(avg, tickers, kind, n))
+            cols["rep"].append(st["rep"].to_numpy())
+
+    index = pd.MultiIndex.from_arrays([
+        pd.Categorical.from_codes(np.concatenate(cols["resolution"]), categories=resolutions),
+        pd.Categorical.from_codes(np.concatenate(cols["baseline"]), categories=[b for b, _, _ in baselines]),
+        np.concatenate(cols["ticker"]),
+        cols["bucket"][0].append(cols["bucket"][1:]),
+    ], names=MULTI_INDEX)
+
+    out = pd.DataFrame({c: np.concatenate(cols[c]) for c in ["avg_sentiment", "volume", "sentiment_base"]}, index=index)
+    out["sentiment_delta"] = out["avg_sentiment"] - out["sentiment_base"]
+    out = classify(out)
+
+    rep = np.concatenate(cols["rep"])
+    out["rep_title"] = titles[rep]
+    out["rep_url"] = urls[rep]
+    out["rep_article_sentiment"] = scores[rep]
+    return out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--resolutions", default=",".join(SIGNAL_RESOLUTIONS), help="comma separated, e.g. 15min,h,D")
+    ap.add_argument("--baselines", default=",".join(SIGNAL_BASELINES), help="comma separated: diff, rolling:N, ewm:SPAN")
+    args = ap.parse_args()
+
+    df = load_latest_sentiment()
+    multi = compute_multi(df, args.resolutions.split(","), args.baselines.split(","))
+
+    out_path = write_table(multi.reset_index(), MULTI)
+    print(f"Saved -> {out_path} ({len(multi)} rows)")
+    print(multi.groupby(level=["resolution", "baseline"], observed=True)["signal"].value_counts().unstack(fill_value=0))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import groupby
+
+import numpy as np
+import pandas as pd
+
+from src.signals.make_signals import SIGNAL_COLUMNS, classify, hour_bucket
+
+# per ticker-hour record layout
+SUM, VOLUME, REP_TITLE, REP_URL, REP_SCORE, REP_ABS, AVG, DELTA, SIGNAL, CONF = range(10)
+
+class SignalAggregator:
+    """
+    Running per-(ticker, hour) sentiment state that produces the same table
+    as compute_signals() without re-reading history.
+
+    For each ticker-hour it keeps the score sum and count plus the article
+    with the largest |score| (first one wins ties, as in the batch sort).
+    New scored rows only touch their own hours, and sentiment_delta changes
+    only for those hours and the next tracked hour of the same ticker, so an
+    update costs O(new rows), not O(history). The materialised table is kept
+    between signals() calls and only the ticker-hours changed since are
+    patched into it.
+    """
+
+    def __init__(self):
+        self.hours = {}  # ticker -> sorted hour keys (ns since epoch)
+        self.records = {}  # (ticker, hour) -> record list, see layout above
+        self.table = None  # column -> array in (ticker, hour) order, as of the last signals()
+        self.dirty = set()  # keys changed or added since the table was built
+        self.dropped = set()  # keys evicted since the table was built
+
+    @staticmethod
+    def _group(rows):
+        """Per ticker-hour sum / count / representative for a batch of scored rows."""
+        rows = rows.assign(hour=hour_bucket(rows), ticker=rows["ticker"].astype(str))
+        rows = rows[rows["hour"].notna()].reset_index(drop=True)
+        rows["rep_abs"] = rows["sentiment_score"].abs()
+
+        g = rows.groupby(["ticker", "hour"], sort=False)
+        stats = g["sentiment_score"].agg(["sum", "count"])
+        rep = rows.loc[g["rep_abs"].idxmax().to_numpy(), ["title", "url", "sentiment_score", "rep_abs"]]
+
+        return zip(
+            stats.index.get_level_values("ticker"),
+            stats.index.get_level_values("hour").asi8,
+            stats["sum"].to_numpy(),
+            stats["count"].to_numpy(),
+            rep.itertuples(index=False, name=None),
+        )
+
+    def _fold(self, groups, replace=False):
+        """Merge grouped stats into the records; returns the keys touched."""
+        touched = []
+        for ticker, hour, total, count, (title, url, score, abs_score) in groups:
+            key = (ticker, hour)
+            rec = None if replace else self.records.get(key)
+            if rec is None:
+                if key not in self.records:
+                    insort(self.hours.setdefault(ticker, []), hour)
+                self.records[key] = [total, int(count), title, url, score, abs_score, np.nan, np.nan, "HOLD", 0.0]
+            else:
+                rec[SUM] += total
+                rec[VOLUME] += int(count)
+                # strictly larger |score| replaces the earlier representative
+                if abs_score > rec[REP_ABS]:
+                    rec[REP_TITLE], rec[REP_URL], rec[REP_SCORE], rec[REP_ABS] = title, url, score, abs_score
+            touched.append(key)
+        return touched
+
+    def _refresh(self, keys):
+        """Recompute avg / delta / signal for keys and the tracked hour after each."""
+        todo = set()
+        for ticker, hour in keys:
+            hours = self.hours[ticker]
+            i = bisect_left(hours, hour)
+            todo.add((ticker, i))
+            if i + 1 < len(hours):
+                todo.add((ticker, i + 1))
+        if not todo:
+            return
+
+        todo = sorted(todo)
+        avg, delta, volume = [], [], []
+        for ticker, i in todo:
+            hours = self.hours[ticker]
+            rec = self.records[(ticker, hours[i])]
+            a = rec[SUM] / rec[VOLUME]
+            if i:
+                prev = self.records[(ticker, hours[i - 1])]
+                delta.append(a - prev[SUM] / prev[VOLUME])
+            else:
+                delta.append(np.nan)
+            avg.append(a)
+            volume.append(rec[VOLUME])
+
+        # same thresholds as the batch path, applied to just the touched rows
+        part = classify(pd.DataFrame({"avg_sentiment": avg, "volume": volume, "sentiment_delta": delta}))
+        for (ticker, i), a, d, sig, conf in zip(todo, avg, delta, part["signal"], part["confidence"]):
+            key = (ticker, self.hours[ticker][i])
+            rec = self.records[key]
+            rec[AVG], rec[DELTA], rec[SIGNAL], rec[CONF] = a, d, sig, conf
+            self.dirty.add(key)
+
+    def update(self, rows):
+        """Fold newly scored rows into the state."""
+        if rows.empty:
+            return
+        self._refresh(self._fold(self._group(rows)))
+
+    def evict(self, cutoff, rows):
+        """
+        Drop ticker-hours that left the window. The hour containing cutoff is
+        only partly outside it, so it is rebuilt from rows, the scored rows
+        still inside the window.
+        """
+        boundary = pd.Timestamp(cutoff).floor("h").value
+        for ticker in list(self.hours):
+            hours = self.hours[ticker]
+            n = bisect_right(hours, boundary)
+            for hour in hours[:n]:
+                del self.records[(ticker, hour)]
+                if self.table is not None:
+                    self.dropped.add((ticker, hour))
+            del hours[:n]
+            if not hours:
+                del self.hours[ticker]
+
+        touched = []
+        if not rows.empty:
+            part = rows[hour_bucket(rows) == pd.Timestamp(boundary, tz="UTC")]
+            if not part.empty:
+                touched = self._fold(self._group(part), replace=True)
+
+        # every ticker's first remaining hour loses its previous hour
+        firsts = [(ticker, hours[0]) for ticker, hours in self.hours.items()]
+        self._refresh(firsts + touched)
+
+    def _columns(self, keys):
+        """Table columns for keys, which must be in (ticker, hour) order."""
+        cols = list(zip(*(self.records[k] for k in keys)))
+        return {
+            "ticker": np.array([t for t, _ in keys], dtype=object),
+            "hour": np.array([h for _, h in keys], dtype="int64"),
+            "avg_sentiment": np.array(cols[AVG], dtype=float),
+            "volume": np.array(cols[VOLUME], dtype="int64"),
+            "sentiment_delta": np.array(cols[DELTA], dtype=float),
+            "signal": np.array(cols[SIGNAL], dtype=object),
+            "confidence": np.array(cols[CONF], dtype=float),
+            "rep_title": np.array(cols[REP_TITLE], dtype=object),
+            "rep_url": np.array(cols[REP_URL], dtype=object),
+            "rep_article_sentiment": np.array(cols[REP_SCORE], dtype=float),
+        }
+
+    @staticmethod
+    def _find(table, keys):
+        """
+        Row of each key (sorted) in table, or where it would be inserted, and
+        whether it is there.
+        """
+        tickers, hours = table["ticker"], table["hour"]
+        pos = np.empty(len(keys), dtype=np.intp)
+        found = np.zeros(len(keys), dtype=bool)
+        i = 0
+        for ticker, group in groupby(keys, key=lambda k: k[0]):
+            wanted = np.array([h for _, h in group], dtype="int64")
+            lo, hi = np.searchsorted(tickers, ticker, "left"), np.searchsorted(tickers, ticker, "right")
+            p = lo + np.searchsorted(hours[lo:hi], wanted)
+            j = i + len(wanted)
+            pos[i:j] = p
+            if hi > lo:
+                found[i:j] = (p < hi) & (hours[np.minimum(p, hi - 1)] == wanted)
+            i = j
+        return pos, found
+
+    def _patch(self):
+        """Table with the changes since the last signals() applied; never edits arrays in place."""
+        table = self.table
+        if self.dropped:
+            pos, found = self._find(table, sorted(self.dropped))
+            keep = np.ones(len(table["hour"]), dtype=bool)
+            keep[pos[found]] = False
+            table = {c: a[keep] for c, a in table.items()}
+
+        keys = sorted(k for k in self.dirty if k in self.records)
+        if not keys:
+            return table
+        pos, found = self._find(table, keys)
+        rows = self._columns(keys)
+        # np.insert puts each new row before its insertion point, which moves
+        # every existing row at or after it down by one
+        ins = pos[~found]
+        moved = pos[found] + np.searchsorted(ins, pos[found], "right")
+        out = {}
+        for c, a in table.items():
+            a = np.insert(a, ins, rows[c][~found]) if len(ins) else a.copy()
+            a[moved] = rows[c][found]
+            out[c] = a
+        return out
+
+    def signals(self):
+        """
+        The current signal table, laid out like compute_signals(). Its columns
+        are the aggregator's own read-only arrays; copy it before editing.
+        """
+        if not self.hours:
+            self.table = None
+            self.dirty.clear()
+            self.dropped.clear()
+            return pd.DataFrame(columns=SIGNAL_COLUMNS)
+
+        if self.table is None:
+            table = self._columns([(t, h) for t in sorted(self.hours) for h in self.hours[t]])
+        else:
+            table = self._patch()
+        for a in table.values():
+            a.flags.writeable = False
+        self.table = table
+        self.dirty.clear()
+        self.dropped.clear()
+
+        hour = pd.DatetimeIndex(table["hour"].view("datetime64[ns]")).tz_localize("UTC")
+        # built without copying, so the cost does not grow with the history
+        return pd.DataFrame({c: hour if c == "hour" else table[c] for c in SIGNAL_COLUMNS}, copy=False)
+
+    def __len__(self):
+        return len(self.records)
@@ -1,66 +1,100 @@
-import glob
 import pandas as pd
 
+from src.config import COUNT_CLUSTERS
+from src.metrics import stage, step
+from src.storage import read_table, table_exists, table_path, write_table
+
 BUY_DELTA = 0.20
 SELL_DELTA = -0.20
 MIN_VOLUME = 2
 
+SENTIMENT = "news_all_sentiment"
+SIGNALS = "signals_latest"
+
 def load_latest_sentiment():
-    files = sorted(glob.glob("data/processed/news_*_sentiment.csv"))
-    if not files:
+    if not table_exists(SENTIMENT):
         raise SystemExit("No sentiment files found. Run: python -m src.nlp.sentiment")
-    latest = files[-1]
-    df = pd.read_csv(latest)
+    df = read_table(SENTIMENT)
     if df.empty:
-        raise SystemExit(f"Sentiment file is empty: {latest}")
+        raise SystemExit(f"Sentiment file is empty: {table_path(SENTIMENT)}")
     return df
 
-def main():
-    df = load_latest_sentiment()
+SIGNAL_COLUMNS = [
+    "hour", "ticker", "avg_sentiment", "volume", "sentiment_delta", "signal", "confidence",
+    "rep_title", "rep_url", "rep_article_sentiment",
+]
 
+def hour_bucket(df):
     # Use published time for bucketing; fallback to scrape time
-    df["published_utc"] = pd.to_datetime(df.get("published_utc"), utc=True, errors="coerce")
-    df["timestamp_utc"] = pd.to_datetime(df.get("timestamp_utc"), utc=True, errors="coerce")
-
+    # (read_table hands both back as tz-aware timestamps)
     ts = df["published_utc"].copy()
     ts = ts.fillna(df["timestamp_utc"])
-    df["hour"] = ts.dt.floor("H")
-
-    # representative article per ticker-hour: largest absolute sentiment
-    tmp = df.copy()
-    tmp["abs_sent"] = tmp["sentiment_score"].abs()
-
-    rep = (
-        tmp.sort_values(["ticker", "hour", "abs_sent"], ascending=[True, True, False])
-        .groupby(["ticker", "hour"], as_index=False)
-        .head(1)[["ticker", "hour", "title", "url", "sentiment_score"]]
-        .rename(columns={
-            "title": "rep_title",
-            "url": "rep_url",
-            "sentiment_score": "rep_article_sentiment"
-        })
-    )
-
-    agg = (
-        df.groupby(["hour", "ticker"])
-          .agg(avg_sentiment=("sentiment_score", "mean"),
-               volume=("sentiment_score", "count"))
-          .reset_index()
-          .sort_values(["ticker", "hour"])
-    )
-
-    agg["sentiment_delta"] = agg.groupby("ticker")["avg_sentiment"].diff()
+    return ts.dt.floor("h")
 
+def classify(agg):
+    """Fill signal / confidence from avg_sentiment, volume and sentiment_delta."""
     agg["signal"] = "HOLD"
     agg.loc[(agg["sentiment_delta"] > BUY_DELTA) & (agg["volume"] >= MIN_VOLUME), "signal"] = "BUY"
     agg.loc[(agg["sentiment_delta"] < SELL_DELTA) & (agg["volume"] >= MIN_VOLUME), "signal"] = "SELL"
 
     agg["confidence"] = (agg["sentiment_delta"].abs().fillna(0) * (agg["volume"] ** 0.5)).clip(0, 3) / 3.0
+    return agg
+
+def _cluster_keys(df):
+    return df["ticker"].astype(str) + ":" + df["cluster_id"].astype("Int64").astype(str)
 
-    agg = agg.merge(rep, on=["ticker", "hour"], how="left")
+def first_copies(df, seen=None, count_clusters=COUNT_CLUSTERS):
+    """
+    With count_clusters, keep one row per (ticker, near-duplicate cluster):
+    later copies of a story, and copies of stories already in seen, are
+    dropped. Rows without a cluster_id are always kept.
+    """
+    if not count_clusters or df.empty or "cluster_id" not in df.columns:
+        return df
+    keys = _cluster_keys(df)
+    keep = ~keys.duplicated()
+    if seen is not None and not seen.empty and "cluster_id" in seen.columns:
+        keep &= ~keys.isin(_cluster_keys(seen[seen["cluster_id"].notna()]))
+    return df[keep | df["cluster_id"].isna()]
+
+def compute_signals(df):
+    """Scored mapped rows -> one signal row per (ticker, hour)."""
+    df = first_copies(df)
+    # one grouped pass over just the columns it needs: mean, count and the
+    # position of the representative article (largest absolute sentiment,
+    # first one on ties)
+    scores = pd.DataFrame({
+        "ticker": df["ticker"].array,
+        "hour": hour_bucket(df).array,
+        "score": df["sentiment_score"].to_numpy(),
+        "abs_sent": df["sentiment_score"].abs().to_numpy(),
+    })
+
+    agg = (
+        scores.groupby(["ticker", "hour"], observed=True)
+              .agg(avg_sentiment=("score", "mean"),
+                   volume=("score", "count"),
+                   rep=("abs_sent", "idxmax"))
+    )
+
+    agg["sentiment_delta"] = agg.groupby(level="ticker", observed=True)["avg_sentiment"].diff()
+
+    agg = classify(agg)
+
+    rep = agg.pop("rep").to_numpy()
+    agg["rep_title"] = df["title"].to_numpy()[rep]
+    agg["rep_url"] = df["url"].to_numpy()[rep]
+    agg["rep_article_sentiment"] = scores["score"].to_numpy()[rep]
+    return agg.reset_index()[SIGNAL_COLUMNS]
+
+def main():
+    with stage("signals") as rec:
+        df = load_latest_sentiment()
+        with step("compute"):
+            agg = compute_signals(df)
 
-    out_path = "data/processed/signals_latest.csv"
-    agg.to_csv(out_path, index=False)
+        out_path = write_table(agg, SIGNALS)
+        rec["rows_in"], rec["rows_out"] = len(df), len(agg)
     print(f"Saved -> {out_path} ({len(agg)} rows)")
 
 if __name__ == "__main__":
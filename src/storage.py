@@ -0,0 +1,104 @@
+import os
+
+import pandas as pd
+
+from src.config import EXPORT_CSV, STORAGE_FORMAT, WINDOW_HOURS
+from src.metrics import step
+
+DATA_DIR = "data/processed"
+
+# column types every stage can rely on after read_table
+TIMESTAMP_COLUMNS = ["timestamp_utc", "published_utc", "hour", "bucket"]
+CATEGORY_COLUMNS = ["ticker", "source", "signal", "resolution", "baseline"]
+
+EXTENSIONS = {"parquet": ".parquet", "csv": ".csv"}
+
+def table_path(name, fmt=STORAGE_FORMAT):
+    return os.path.join(DATA_DIR, name + EXTENSIONS[fmt])
+
+def _find(name):
+    """Path of a table in the configured format, else in any other format."""
+    for fmt in [STORAGE_FORMAT] + [f for f in EXTENSIONS if f != STORAGE_FORMAT]:
+        path = table_path(name, fmt)
+        if os.path.exists(path):
+            return path, fmt
+    return None, None
+
+def table_exists(name):
+    return _find(name)[0] is not None
+
+def table_mtime(name):
+    path, _ = _find(name)
+    return os.path.getmtime(path) if path else None
+
+def typed(df):
+    """tz-aware UTC timestamps and categorical ticker/source/signal columns."""
+    df = df.copy()
+    for col in TIMESTAMP_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.DatetimeTZDtype):
+            df[col] = pd.to_datetime(df[col], utc=True, errors="coerce", format="ISO8601")
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+def write_table(df, name, fmt=STORAGE_FORMAT, export_csv=EXPORT_CSV):
+    """Write a stage output; returns the path written."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = table_path(name, fmt)
+    # write-then-rename so readers never see a half-written file
+    tmp = path + ".tmp"
+
+    with step("write"):
+        if fmt == "parquet":
+            try:
+                typed(df).to_parquet(tmp, index=False)
+            except ImportError:
+                raise SystemExit("Parquet storage needs pyarrow. Run: pip install pyarrow (or set STORAGE_FORMAT = \"csv\")")
+        else:
+            df.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+
+        if export_csv and fmt != "csv":
+            df.to_csv(table_path(name, "csv"), index=False)
+    return path
+
+def read_table(name):
+    """Read a stage output with typed columns; raises FileNotFoundError if missing."""
+    path, fmt = _find(name)
+    if path is None:
+        raise FileNotFoundError(table_path(name))
+
+    with step("read"):
+        if fmt == "parquet":
+            return pd.read_parquet(path)
+        try:
+            df = pd.read_csv(path)
+        except pd.errors.EmptyDataError:
+            return pd.DataFrame()
+        return typed(df)
+
+def in_window(df, hours=WINDOW_HOURS):
+    """Rows whose published time (scrape time if unknown) is inside the window."""
+    cutoff = pd.Timestamp.utcnow() - pd.Timedelta(hours=hours)
+    ts = df["published_utc"]
+    if "timestamp_utc" in df.columns:
+        ts = ts.fillna(df["timestamp_utc"])
+    return ts.isna() | (ts >= cutoff)
+
+def append_window(name, new, hours=WINDOW_HOURS, fresh=False):
+    """
+    Append typed rows to a table and drop the ones that left the window.
+    fresh=True ignores whatever the table held before. Returns the new table.
+    """
+    frames = []
+    if not fresh and table_exists(name):
+        old = read_table(name)
+        if not old.empty:
+            frames.append(old[in_window(old, hours)])
+    if not new.empty:
+        frames.append(new)
+
+    out = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    write_table(out, name)
+    return out